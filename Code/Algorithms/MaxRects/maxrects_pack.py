@@ -0,0 +1,165 @@
+import os
+import sys
+import time
+import numpy as np
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'bottom_left'))  # instance_io在同级的bottom_left目录中
+from instance_io import read_input_from_file
+
+
+# 按高度降序排列的物品编号，高度相同时保持文件中的顺序
+def decreasing_height_order(AllItem):
+    return np.argsort(-AllItem[:, 1], kind='stable')
+
+
+# 按较长边降序排列的物品编号，允许旋转时物品的高度不固定，用较长边代替高度
+def decreasing_long_side_order(AllItem):
+    return np.argsort(-AllItem.max(axis=1), kind='stable')
+
+
+# 空闲矩形表：保存箱子中所有极大的空闲矩形，按列存放[左x, 下y, 右x, 上y, 宽度, 高度]，每一列是一个矩形
+# 放入物品时，与物品相交的空闲矩形被切分成最多4个极大矩形（左、右、下、上），
+# 再删除被其他空闲矩形包含的矩形。只有切分出的新矩形可能包含别的矩形或被别的矩形包含，
+# 而与新矩形有包含关系的矩形一定与所有新矩形的外接矩形相交，所以先用外接矩形批量筛出附近的矩形，
+# 只在这些矩形中逐个做包含判断，不做所有矩形两两比较
+class FreeRects:
+    def __init__(self, width, height):
+        self.rects = np.array([[0], [0], [width], [height], [width], [height]], dtype=np.int64)
+        self.scale = np.int64(width + height + 1)  # 把两个比较关键字合成一个整数时使用
+
+    def __len__(self):
+        return self.rects.shape[1]
+
+    # 为宽w、高h的物品选择位置
+    # 输入rule：  'bssf'（best short side fit）选择放入后较短剩余边最小的空闲矩形，相同时比较较长剩余边；
+    #            'bl'（bottom-left）选择放入后物品上边最低的位置，相同时选择最左边的
+    # 输入allow_rotation：是否同时考虑旋转90°后的方向，两个方向在同一次批量比较中选出
+    # 输出：  (物品左下角x，左下角y，是否旋转)，没有放得下的空闲矩形时返回None；两个方向同样好时不旋转
+    def find(self, w, h, rule='bssf', allow_rotation=False):
+        x1, y1, _, _, fw, fh = self.rects
+        if allow_rotation and w != h:
+            ws, hs = np.array([[w], [h]]), np.array([[h], [w]])
+        else:
+            ws, hs = np.array([[w]]), np.array([[h]])
+        rot, idx = np.nonzero((fw >= ws) & (fh >= hs))  # 每个方向放得下的空闲矩形
+        if len(idx) == 0:
+            return None
+        ws, hs = ws[rot, 0], hs[rot, 0]
+        if rule == 'bssf':
+            dw, dh = fw[idx] - ws, fh[idx] - hs
+            key = np.minimum(dw, dh) * self.scale + np.maximum(dw, dh)
+        elif rule == 'bl':
+            key = (y1[idx] + hs) * self.scale + x1[idx]
+        else:
+            raise ValueError(f"unknown rule: {rule}")
+        k = np.argmin(key)
+        return int(x1[idx[k]]), int(y1[idx[k]]), int(rot[k])
+
+    # 在(x, y)放入宽w、高h的物品，切分与之相交的空闲矩形并删除被包含的矩形
+    def place(self, x, y, w, h):
+        rects = self.rects
+        x1, y1, x2, y2 = rects[:4]
+        hit = (x1 < x + w) & (x2 > x) & (y1 < y + h) & (y2 > y)
+        new = []
+        for rx1, ry1, rx2, ry2 in rects[:4, hit].T.tolist():
+            if x > rx1:  # 左边剩余部分
+                new.append((rx1, ry1, x, ry2))
+            if x + w < rx2:  # 右边剩余部分
+                new.append((x + w, ry1, rx2, ry2))
+            if y > ry1:  # 下方剩余部分
+                new.append((rx1, ry1, rx2, y))
+            if y + h < ry2:  # 上方剩余部分
+                new.append((rx1, y + h, rx2, ry2))
+        if not new:
+            self.rects = rects[:, ~hit]
+            return
+
+        # 新矩形之间：被另一个新矩形包含的删除，完全相同的只保留第一个
+        new = [a for k, a in enumerate(new)
+               if not any(b[0] <= a[0] and b[1] <= a[1] and b[2] >= a[2] and b[3] >= a[3] and (b != a or m < k)
+                          for m, b in enumerate(new) if m != k)]
+
+        # 与新矩形外接矩形相交的原有空闲矩形，新矩形只与它们做包含判断
+        near = np.flatnonzero(~hit & (x1 < max(a[2] for a in new)) & (x2 > min(a[0] for a in new))
+                              & (y1 < max(a[3] for a in new)) & (y2 > min(a[1] for a in new)))
+        if len(near):
+            nearRects = rects[:4, near].T.tolist()
+            # 被原有空闲矩形包含的新矩形删除
+            new = [a for a in new
+                   if not any(b[0] <= a[0] and b[1] <= a[1] and b[2] >= a[2] and b[3] >= a[3] for b in nearRects)]
+            # 被新矩形包含的原有空闲矩形删除
+            for k, b in zip(near.tolist(), nearRects):
+                if any(a[0] <= b[0] and a[1] <= b[1] and a[2] >= b[2] and a[3] >= b[3] for a in new):
+                    hit[k] = True
+        if new:
+            new = np.array(new, dtype=np.int64).T
+            new = np.concatenate((new, new[2:4] - new[0:2]))  # 补上宽度和高度
+            self.rects = np.concatenate((rects[:, ~hit], new), axis=1)
+        else:
+            self.rects = rects[:, ~hit]
+
+    # 删除放不下任何剩余物品的空闲矩形
+    # 输入minWidth：  minWidth[t]为高度不超过t的剩余物品中的最小宽度，长度为最大物品高度+1
+    # 这些矩形不会再被选中，它们包含的矩形也一样，删除后装箱结果不变，但空闲矩形表不会越来越长
+    def drop_unusable(self, minWidth):
+        fw, fh = self.rects[4], self.rects[5]
+        self.rects = self.rects[:, minWidth[np.minimum(fh, len(minWidth) - 1)] <= fw]
+
+
+# 高度不超过t的物品中的最小宽度，t从0到最大物品高度
+# 允许旋转时两个方向都算作可以放入的尺寸
+def min_width_by_height(AllItem, items, maxHeight, allow_rotation=False):
+    minWidth = np.full(maxHeight + 1, np.iinfo(np.int64).max, dtype=np.int64)
+    np.minimum.at(minWidth, AllItem[items, 1], AllItem[items, 0])
+    if allow_rotation:
+        np.minimum.at(minWidth, AllItem[items, 0], AllItem[items, 1])
+    return np.minimum.accumulate(minWidth)
+
+
+# MaxRects：维护箱子中所有极大的空闲矩形，每个物品放入按rule选出的空闲矩形的左下角
+# 输入WIDTH：   箱子宽度
+# 输入AllItem： 各个物品[宽度，高度]
+# 输入rule：    'bssf'或'bl'，见FreeRects.find
+# 输入order：   物品装箱顺序，默认按高度降序，允许旋转时按较长边降序
+# 输入prune_every：每装入多少个物品删除一次放不下任何剩余物品的空闲矩形
+# 输入allow_rotation：是否允许物品旋转90°
+# 输出RPNXY：   各物品[物品编号，右上角X，右上角Y]，与bottom_left中的RPNXY格式相同；允许旋转时每行最后加一列是否旋转
+# 输出totalHeight：所有物品的最高点
+def maxrects(WIDTH, AllItem, rule='bssf', order=None, prune_every=32, allow_rotation=False):
+    AllItem = np.asarray(AllItem)
+    if order is None:
+        order = decreasing_long_side_order(AllItem) if allow_rotation else decreasing_height_order(AllItem)
+    order = np.asarray(order)
+    maxHeight = int(AllItem.max() if allow_rotation else AllItem[:, 1].max()) if len(AllItem) else 0
+    free = FreeRects(WIDTH, int(AllItem.max(axis=1).sum() if allow_rotation else AllItem[:, 1].sum()))  # 箱子高度取所有物品高度之和，一定放得下
+    RPNXY = np.zeros((len(order), 4 if allow_rotation else 3), dtype=np.int64)
+    totalHeight = 0
+    for k, i in enumerate(order):
+        if k and k % prune_every == 0:
+            free.drop_unusable(min_width_by_height(AllItem, order[k:], maxHeight, allow_rotation))
+        w, h = int(AllItem[i, 0]), int(AllItem[i, 1])
+        pos = free.find(w, h, rule, allow_rotation)
+        if pos is None:
+            raise ValueError(f"item {i} is wider than the bin: {min(w, h) if allow_rotation else w} > {WIDTH}")
+        x, y, rot = pos
+        if rot:
+            w, h = h, w
+        free.place(x, y, w, h)
+        RPNXY[k, :3] = (i, x + w, y + h)
+        if allow_rotation:
+            RPNXY[k, 3] = rot
+        if y + h > totalHeight:
+            totalHeight = y + h
+    return RPNXY, totalHeight
+
+
+if __name__ == '__main__':
+    filename = sys.argv[1] if len(sys.argv) > 1 else 'test_size_10000_dist_1.txt'
+    WIDTH, itemNum, AllItem = read_input_from_file(filename)
+    total_area = int((AllItem[:, 0].astype(np.int64) * AllItem[:, 1]).sum())
+    print(f"WIDTH = {WIDTH}\t Number of items: {itemNum}")
+    for name, rule, rotation in [('MaxRects-BSSF', 'bssf', False), ('MaxRects-BL', 'bl', False),
+                                 ('MaxRects-BSSF (rotation)', 'bssf', True), ('MaxRects-BL (rotation)', 'bl', True)]:
+        start_time = time.perf_counter()
+        RPNXY, totalHeight = maxrects(WIDTH, AllItem, rule, allow_rotation=rotation)
+        execution_time = time.perf_counter() - start_time
+        print(f"{name}: Height: {totalHeight}\t Coverage Ratio: {total_area / (WIDTH * totalHeight):.4f}\t 执行时间: {execution_time:.4f} 秒")
@@ -0,0 +1,103 @@
+import os
+import sys
+import time
+import numpy as np
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'bottom_left'))  # instance_io在同级的bottom_left目录中
+from instance_io import read_input_from_file
+
+
+# 按高度降序排列的物品编号，高度相同时保持文件中的顺序
+def decreasing_height_order(AllItem):
+    return np.argsort(-AllItem[:, 1], kind='stable')
+
+
+# NFDH（Next Fit Decreasing Height）：物品按高度降序，只往当前货架放，放不下就开新货架
+# 输入WIDTH：   货架（箱子）宽度
+# 输入AllItem： 各个物品[宽度，高度]
+# 输出RPNXY：   各物品[物品编号，右上角X，右上角Y]，与bottom_left中的RPNXY格式相同
+# 输出totalHeight：所有货架的总高度
+def nfdh(WIDTH, AllItem):
+    AllItem = np.asarray(AllItem)
+    RPNXY = np.zeros((len(AllItem), 3), dtype=np.int64)
+    shelfWidth = WIDTH  # 当前货架已用宽度，初始时视为已满，第一个物品会开新货架
+    shelfBase = 0  # 当前货架底边的y坐标
+    shelfHeight = 0  # 当前货架高度
+    for k, i in enumerate(decreasing_height_order(AllItem)):
+        w, h = int(AllItem[i, 0]), int(AllItem[i, 1])
+        if shelfWidth + w > WIDTH:  # 当前货架放不下，开新货架
+            shelfBase += shelfHeight
+            shelfWidth, shelfHeight = 0, h  # 高度降序，新货架高度就是第一个物品的高度
+        shelfWidth += w
+        RPNXY[k] = (i, shelfWidth, shelfBase + h)
+    return RPNXY, shelfBase + shelfHeight
+
+
+# 货架剩余宽度的最大值线段树，叶子按开货架的先后顺序排列，未使用的叶子为-1
+# 每个内部节点保存子树中剩余宽度的最大值，查找第一个放得下的货架和更新剩余宽度都是O(log 货架数)
+class ShelfTree:
+    def __init__(self, capacity):
+        self.size = 1
+        while self.size < max(1, capacity):
+            self.size *= 2
+        self.tree = [-1] * (2 * self.size)
+
+    # 第一个剩余宽度不小于w的货架编号，没有时返回-1
+    def first_fit(self, w):
+        tree = self.tree
+        if tree[1] < w:
+            return -1
+        node = 1
+        while node < self.size:
+            node *= 2
+            if tree[node] < w:  # 左子树放不下，去右子树
+                node += 1
+        return node - self.size
+
+    # 将货架k的剩余宽度设为remain，并更新祖先节点的最大值
+    def update(self, k, remain):
+        tree = self.tree
+        node = k + self.size
+        tree[node] = remain
+        node //= 2
+        while node:
+            best = max(tree[2 * node], tree[2 * node + 1])
+            if tree[node] == best:
+                break
+            tree[node] = best
+            node //= 2
+
+
+# FFDH（First Fit Decreasing Height）：物品按高度降序，放入第一个放得下的货架，都放不下就开新货架
+# 用ShelfTree查找第一个放得下的货架，每个物品O(log 货架数)
+# 输入输出与nfdh相同
+def ffdh(WIDTH, AllItem):
+    AllItem = np.asarray(AllItem)
+    RPNXY = np.zeros((len(AllItem), 3), dtype=np.int64)
+    tree = ShelfTree(len(AllItem))
+    shelfBase = []  # 各货架底边的y坐标
+    shelfUsed = []  # 各货架已用宽度
+    totalHeight = 0
+    for k, i in enumerate(decreasing_height_order(AllItem)):
+        w, h = int(AllItem[i, 0]), int(AllItem[i, 1])
+        s = tree.first_fit(w)
+        if s < 0:  # 所有货架都放不下，开新货架，高度就是该物品的高度
+            s = len(shelfBase)
+            shelfBase.append(totalHeight)
+            shelfUsed.append(0)
+            totalHeight += h
+        shelfUsed[s] += w
+        tree.update(s, WIDTH - shelfUsed[s])
+        RPNXY[k] = (i, shelfUsed[s], shelfBase[s] + h)
+    return RPNXY, totalHeight
+
+
+if __name__ == '__main__':
+    filename = sys.argv[1] if len(sys.argv) > 1 else 'test_size_10000_dist_1.txt'
+    WIDTH, itemNum, AllItem = read_input_from_file(filename)
+    total_area = int((AllItem[:, 0].astype(np.int64) * AllItem[:, 1]).sum())
+    print(f"WIDTH = {WIDTH}\t Number of items: {itemNum}")
+    for name, algorithm in [('NFDH', nfdh), ('FFDH', ffdh)]:
+        start_time = time.perf_counter()
+        RPNXY, totalHeight = algorithm(WIDTH, AllItem)
+        execution_time = time.perf_counter() - start_time
+        print(f"{name}: Height of all shelves: {totalHeight}\t Coverage Ratio: {total_area / (WIDTH * totalHeight):.4f}\t 执行时间: {execution_time:.4f} 秒")
@@ -0,0 +1,121 @@
+import argparse
+import os
+import time
+from multiprocessing import Pool
+import numpy as np
+from bestfit_pack import bestfit
+from instance_io import read_input_from_file
+
+
+# 纹理图集模式：把物品分配到多张固定大小（例如2048×2048）的页面上，每张页面由一个子进程独立装箱
+#   1. 按总面积估计页面数，物品按面积降序蛇形轮流分配到各页面，使每页的大小物品搭配相近
+#   2. 各页面并行用天际线最佳适应（bestfit）装箱，超出页面高度的物品退回
+#   3. 退回的物品分配到新的页面，重复直到所有物品都放下
+# 页面之间互不影响，页面数越多，并行度越高
+FILL = 1.0  # 分配时每页物品面积之和不超过页面面积的比例；取1时页面数最少，装不下的少量物品在下一轮分配到新页面
+
+RESULT_DTYPE = np.dtype([('id', np.int32), ('page', np.int32), ('x', np.int32), ('y', np.int32), ('rot', np.int8)])
+
+
+# 把物品分配到若干页面
+# 输入ids：     需要分配的物品编号
+# 输出：  各页面的物品编号列表
+def assign_pages(ids, AllItem, page_width, page_height, fill=FILL):
+    ids = np.asarray(ids)
+    area = AllItem[ids, 0].astype(np.int64) * AllItem[ids, 1]
+    numPages = max(1, int(np.ceil(area.sum() / (fill * page_width * page_height))))
+    ids = ids[np.argsort(-area, kind='stable')]
+    # 蛇形分配：0,1,...,n-1,n-1,...,1,0,0,1,...，避免最大的物品总落在前几页
+    k = np.arange(len(ids)) % (2 * numPages)
+    page = np.where(k < numPages, k, 2 * numPages - 1 - k)
+    return [ids[page == p] for p in range(numPages) if (page == p).any()]
+
+
+# 子进程任务：装一张页面
+# 输入job：  (页面编号，物品编号，各物品[宽度，高度]，页面宽度，页面高度，是否允许旋转)
+# 输出：  (页面编号，放下的物品[物品编号，左下角x，左下角y，是否旋转]，退回的物品编号)
+def pack_page(job):
+    page, ids, items, page_width, page_height, allow_rotation = job
+    RPNXY, _ = bestfit(page_width, items, allow_rotation, page_height)  # 不使用高度超出页面的方向
+    k, X, Y = RPNXY[:, 0], RPNXY[:, 1], RPNXY[:, 2]
+    rot = RPNXY[:, 3] if allow_rotation else np.zeros(len(k), dtype=np.int64)
+    size = np.where(rot[:, None] != 0, items[k, ::-1], items[k])  # 装入时的宽度和高度
+    fits = Y <= page_height  # 物品上边不超出页面；去掉超出的物品不影响其余物品的位置
+    placed = np.column_stack((ids[k[fits]], X[fits] - size[fits, 0], Y[fits] - size[fits, 1], rot[fits]))
+    return page, placed, ids[k[~fits]]
+
+
+# 纹理图集装箱
+# 输入AllItem：  各个物品[宽度，高度]
+# 输入page_width、page_height：页面宽度和高度
+# 输入workers：  进程数，默认为CPU核数；为1时在当前进程中装箱
+# 输入allow_rotation：是否允许物品旋转90°
+# 输出：  RESULT_DTYPE记录数组，按物品编号排列，每个物品的(物品编号，页面编号，左下角x，左下角y，是否旋转)
+def pack_atlas(AllItem, page_width, page_height, workers=None, fill=FILL, allow_rotation=False):
+    AllItem = np.asarray(AllItem)
+    big = (AllItem[:, 0] > page_width) | (AllItem[:, 1] > page_height)
+    if allow_rotation:
+        big &= (AllItem[:, 1] > page_width) | (AllItem[:, 0] > page_height)
+    if big.any():
+        i = int(np.flatnonzero(big)[0])
+        raise ValueError(f"item {i} does not fit on a page: {AllItem[i, 0]}x{AllItem[i, 1]} > {page_width}x{page_height}")
+    if workers is None:
+        workers = os.cpu_count()
+
+    result = np.zeros(len(AllItem), dtype=RESULT_DTYPE)
+    result['id'] = np.arange(len(AllItem))
+    pending = np.arange(len(AllItem))
+    numPages = 0
+    pool = Pool(workers) if workers > 1 else None
+    try:
+        while len(pending):
+            pages = assign_pages(pending, AllItem, page_width, page_height, fill)
+            jobs = [(numPages + p, ids, AllItem[ids], page_width, page_height, allow_rotation)
+                    for p, ids in enumerate(pages)]
+            numPages += len(pages)
+            results = pool.imap_unordered(pack_page, jobs) if pool and len(jobs) > 1 else map(pack_page, jobs)
+            overflow = []
+            for page, placed, rest in results:
+                result['page'][placed[:, 0]] = page
+                result['x'][placed[:, 0]] = placed[:, 1]
+                result['y'][placed[:, 0]] = placed[:, 2]
+                result['rot'][placed[:, 0]] = placed[:, 3]
+                overflow.append(rest)
+            pending = np.sort(np.concatenate(overflow))  # 与各页面完成的先后无关
+    finally:
+        if pool:
+            pool.close()
+            pool.join()
+    return result
+
+
+# 每张页面的物品面积之和除以页面面积
+def page_coverage(result, AllItem, page_width, page_height):
+    area = AllItem[result['id'], 0].astype(np.int64) * AllItem[result['id'], 1]
+    return np.bincount(result['page'], weights=area) / (page_width * page_height)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='纹理图集模式：把物品装入多张固定大小的页面，各页面并行装箱')
+    parser.add_argument('filename', help='算例文件（Test_cases格式的.txt或.npy）')
+    parser.add_argument('--page-width', type=int, default=2048, help='页面宽度')
+    parser.add_argument('--page-height', type=int, default=2048, help='页面高度')
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help='进程数')
+    parser.add_argument('--rotate', action='store_true', help='允许物品旋转90°')
+    parser.add_argument('--out', default='atlas.csv', help='输出文件，每行为物品编号,页面编号,x,y,是否旋转')
+    args = parser.parse_args()
+
+    _, itemNum, AllItem = read_input_from_file(args.filename)
+    start_time = time.perf_counter()
+    result = pack_atlas(AllItem, args.page_width, args.page_height, args.workers, allow_rotation=args.rotate)
+    execution_time = time.perf_counter() - start_time
+    coverage = page_coverage(result, AllItem, args.page_width, args.page_height)
+    print(f"Number of items: {itemNum}\t Pages: {len(coverage)}\t 执行时间: {execution_time:.4f} 秒")
+    print(f"Page coverage: min {coverage.min():.4f}\t mean {coverage.mean():.4f}")
+    np.savetxt(args.out, np.column_stack([result[name] for name in RESULT_DTYPE.names]), fmt='%d', delimiter=',',
+               header='id,page,x,y,rot', comments='')
+    print(f"Atlas saved to {args.out}")
+
+
+if __name__ == '__main__':
+    main()
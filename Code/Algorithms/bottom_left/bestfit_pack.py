@@ -0,0 +1,120 @@
+import sys
+import time
+from bisect import bisect_right
+import numpy as np
+from tools import Skyline
+from instance_io import read_input_from_file
+
+
+# 按宽度分组的未装入物品，用于查找放得进某个空隙的最宽物品
+# widths为有剩余物品的宽度（升序），buckets[w]为宽度为w的剩余物品编号，按高度升序排列，末尾是最高的
+# 查找时在widths中二分，取出和删除都在列表末尾，不需要遍历所有未装入的物品
+# 允许旋转时，不是正方形且旋转后放得进箱子的物品再以旋转后的宽度加入一次（编号记为-1-i），
+# 一次二分同时比较两个方向；物品的一个方向被取出后，另一个方向在取到时跳过
+# 给出max_height时（例如图集页面的高度），高度超过max_height的方向不加入，每个物品至少要有一个方向满足
+class WidthIndex:
+    def __init__(self, AllItem, width=None, allow_rotation=False, max_height=None):
+        AllItem = np.asarray(AllItem)
+        ids = np.arange(len(AllItem))
+        keep = np.ones(len(AllItem), dtype=bool) if max_height is None else AllItem[:, 1] <= max_height
+        ids, size = ids[keep], AllItem[keep]
+        if allow_rotation:
+            rot = (AllItem[:, 0] != AllItem[:, 1]) & (width is None or AllItem[:, 1] <= width)
+            if max_height is not None:
+                rot &= AllItem[:, 0] <= max_height
+            rotIds = np.flatnonzero(rot)
+            ids = np.concatenate((ids, -1 - rotIds))
+            size = np.concatenate((size, AllItem[rotIds, ::-1]))
+        order = np.lexsort((size[:, 1], size[:, 0]))  # 先按宽度、再按高度升序
+        widths, starts = np.unique(size[order, 0], return_index=True)
+        self.widths = widths.tolist()
+        self.buckets = {w: ids[k].tolist() for w, k in zip(self.widths, np.split(order, starts[1:]))}
+        self.taken = np.zeros(len(AllItem), dtype=bool)
+        self.left = len(AllItem)  # 未装入的物品数
+
+    def __len__(self):
+        return self.left
+
+    # 取出宽度不超过gap的物品中最宽的一个，宽度相同时取最高的
+    # 输出：  (物品编号，是否旋转)，没有放得进的物品时返回None
+    def pop_best(self, gap):
+        while True:
+            p = bisect_right(self.widths, gap)
+            if p == 0:
+                return None
+            w = self.widths[p - 1]
+            bucket = self.buckets[w]
+            i = bucket.pop()
+            if not bucket:
+                del self.widths[p - 1], self.buckets[w]
+            rot = i < 0
+            if rot:
+                i = -1 - i
+            if not self.taken[i]:
+                self.taken[i] = True
+                self.left -= 1
+                return i, int(rot)
+
+
+# 天际线最佳适应（best-fit）：每一步找到天际线最低的一段空隙，从未装入的物品中选出放得进的最宽物品
+# （宽度相同时选最高的），靠着两侧较高的一边放在空隙底部；没有物品放得进时，把空隙填高到两侧中较低的一边
+# 与按固定顺序装箱不同，物品的装入顺序由空隙决定
+# 输入WIDTH：   箱子宽度
+# 输入AllItem： 各个物品[宽度，高度]
+# 输入allow_rotation：是否允许物品旋转90°，两个方向都在WidthIndex中，一次查找同时比较
+# 输入max_height：可选的高度上限，装入时不使用高度超过它的方向；物品仍可能放到max_height以上，由调用者处理
+# 输出RPNXY：   各物品[物品编号，右上角X，右上角Y]，按装入顺序排列；允许旋转时每行最后加一列是否旋转
+# 输出totalHeight：所有物品的最高点
+def bestfit(WIDTH, AllItem, allow_rotation=False, max_height=None):
+    AllItem = np.asarray(AllItem)
+    minSide = AllItem.min(axis=1) if allow_rotation else AllItem[:, 0]  # 放入箱子时宽度的最小值
+    if len(AllItem) and minSide.max() > WIDTH:
+        i = int(minSide.argmax())
+        raise ValueError(f"item {i} is wider than the bin: {minSide[i]} > {WIDTH}")
+    if len(AllItem) and max_height is not None:
+        w, h = AllItem[:, 0], AllItem[:, 1]
+        fits = (w <= WIDTH) & (h <= max_height)
+        if allow_rotation:
+            fits |= (h <= WIDTH) & (w <= max_height)
+        if not fits.all():
+            i = int(np.flatnonzero(~fits)[0])
+            raise ValueError(f"item {i} does not fit in {WIDTH}x{max_height}: {w[i]}x{h[i]}")
+    index = WidthIndex(AllItem, WIDTH, allow_rotation, max_height)
+    skyline = Skyline(WIDTH)
+    Item = AllItem.tolist()
+    RPNXY = np.zeros((len(AllItem), 4 if allow_rotation else 3), dtype=np.int64)
+    totalHeight = 0
+    k = 0
+    while index:
+        s, x, gap, y = skyline.lowest()
+        ys = skyline.ys
+        leftH = ys[s - 1] if s > 0 else float('inf')  # 左侧一段的高度，箱子边界视为无穷高
+        rightH = ys[s + 1] if s + 1 < len(ys) else float('inf')
+        best = index.pop_best(gap)
+        if best is None:  # 空隙太窄，填高到两侧中较低的一边，与那一段合并
+            skyline.add(x, gap, min(leftH, rightH))
+            continue
+        i, rot = best
+        w, h = Item[i][::-1] if rot else Item[i]
+        if rightH > leftH:  # 靠着较高的一侧放置
+            x += gap - w
+        skyline.add(x, w, y + h)
+        RPNXY[k, :3] = (i, x + w, y + h)
+        if allow_rotation:
+            RPNXY[k, 3] = rot
+        k += 1
+        if y + h > totalHeight:
+            totalHeight = y + h
+    return RPNXY, totalHeight
+
+
+if __name__ == '__main__':
+    filename = sys.argv[1] if len(sys.argv) > 1 else 'test_size_10000_dist_1.txt'
+    WIDTH, itemNum, AllItem = read_input_from_file(filename)
+    total_area = int((AllItem[:, 0].astype(np.int64) * AllItem[:, 1]).sum())
+    print(f"WIDTH = {WIDTH}\t Number of items: {itemNum}")
+    for name, rotation in [('Skyline best-fit', False), ('Skyline best-fit (rotation)', True)]:
+        start_time = time.perf_counter()
+        RPNXY, totalHeight = bestfit(WIDTH, AllItem, rotation)
+        execution_time = time.perf_counter() - start_time
+        print(f"{name}: Height: {totalHeight}\t Coverage Ratio: {total_area / (WIDTH * totalHeight):.4f}\t 执行时间: {execution_time:.4f} 秒")
@@ -0,0 +1,87 @@
+import numpy as np
+from tools import PackState, newIndex, overlap, finalPos, finalPosBatch
+
+
+# 左下角（bottom-left）装箱引擎
+# 构造时对算例做一次预处理并分配好所有缓冲区，之后每次try_pack只需给出装箱顺序，
+# 缓冲区（装箱状态、物品标记、索引）在原处清空复用，多次尝试不同顺序时只付出装箱本身的开销
+# 允许旋转时，每个物品的两个方向用finalPosBatch一次批量下降和左移，选择上边较低（相同时较靠左）的方向
+class BottomLeftPacker:
+    # 输入WIDTH：   箱子宽度，整数
+    # 输入AllItem： 各个物品[宽度，高度]，整数数组；非整数或小于1x1时报错ValueError
+    # 输入allow_rotation：是否允许物品旋转90°
+    def __init__(self, WIDTH, AllItem, allow_rotation=False):
+        self.WIDTH = WIDTH  # 箱子的宽度
+        self.AllItem = np.asarray(AllItem)  # 所有物品的尺寸
+        if len(self.AllItem) and self.AllItem.min() < 1:  # 宽度为0的物品在轮廓索引中没有占用任何列
+            i = int(self.AllItem.min(axis=1).argmin())
+            raise ValueError(f"item {i} size must be at least 1x1, got {self.AllItem[i, 0]}x{self.AllItem[i, 1]}")
+        self.itemNum = len(self.AllItem)  # 物品数量
+        height = self.AllItem.max(axis=1) if allow_rotation else self.AllItem[:, 1]  # 允许旋转时物品的高度可能是较长的一边
+        self.LENGTH = int(max(height)) * self.itemNum  # 箱子的初始长度为物品中最大高度乘以物品数
+        self.items = list(self.AllItem)  # 每个物品的[宽度，高度]，避免装箱时反复切片
+        self.allow_rotation = allow_rotation
+        self.RPNXY = PackState(self.itemNum)  # 已装入物品的位置
+        self.flagItem = np.zeros(self.itemNum, dtype=bool)  # 标记物品是否已被装入箱子
+        self.index = newIndex(WIDTH, self.AllItem, allow_rotation)  # 已装入物品的索引
+        self.max_length = 0  # 当前箱子最大的装载长度
+
+    # 按顺序order尝试将所有物品装入长度为bin_length的箱子
+    # 输入order：      物品装箱顺序，默认为文件中的顺序
+    # 输入bin_length： 箱子长度，默认为初始长度LENGTH
+    # 输出：  所有物品都装入箱子返回True，否则返回False；装箱结果保存在RPNXY和max_length中
+    def try_pack(self, order=None, bin_length=None):
+        if order is None:
+            order = range(self.itemNum)
+        if bin_length is None:
+            bin_length = self.LENGTH
+        Bin = [self.WIDTH, bin_length]  # 初始位置在箱子右上角
+        RPNXY, flagItem, index, items = self.RPNXY, self.flagItem, self.index, self.items
+        RPNXY.reset()  # 清空已装入的物品记录
+        flagItem[:] = False  # 重置物品装入标记
+        index.reset()  # 清空索引
+
+        for i in order:
+            if not flagItem[i]:  # 如果物品没有被装入
+                item = items[i]
+                if self.allow_rotation and item[0] != item[1]:
+                    self._place_rotatable(i, item, Bin)
+                elif overlap(item, self.AllItem, Bin, RPNXY, index) == 0:  # 如果没有重叠
+                    itemRP = finalPos(item, self.AllItem, Bin, RPNXY, index)  # 获取物品的最终位置
+                    RPNXY.add(i, item, itemRP)  # 记录物品的坐标
+                    index.add(item, itemRP)  # 更新索引
+                    flagItem[i] = True  # 标记物品已经装入
+        self.max_length = RPNXY.top  # 箱子的最大长度，RPNXY装入物品时已经更新
+        return bool(flagItem.all())
+
+    # 物品i的两个方向中放得进箱子、在右上角不重叠的，一起下降和左移，装入上边较低（相同时较靠左）的方向
+    def _place_rotatable(self, i, item, Bin):
+        RPNXY, index = self.RPNXY, self.index
+        cands = [(item, 0), (item[::-1], 1)]
+        cands = [(it, rot) for it, rot in cands
+                 if it[0] <= Bin[0] and it[1] <= Bin[1] and overlap(it, self.AllItem, Bin, RPNXY, index) == 0]
+        if not cands:
+            return
+        RP = finalPosBatch([it for it, _ in cands], self.AllItem, [Bin] * len(cands), RPNXY, index)
+        k = min(range(len(cands)), key=lambda k: (RP[k][1], RP[k][0]))  # 相同时取第一个，即不旋转
+        it, rot = cands[k]
+        itemRP = RP[k]
+        RPNXY.add(i, it, itemRP, rot)
+        index.add(it, itemRP)
+        self.flagItem[i] = True
+
+    # 最近一次装箱的结果，[物品编号，X，Y]数组；允许旋转时每行为[物品编号，X，Y，是否旋转]
+    def records(self):
+        return self.RPNXY.records(self.allow_rotation)
+
+    # 最近一次装箱已装入物品的总面积，装箱时累加，不需要重新计算
+    @property
+    def placed_area(self):
+        return self.RPNXY.placed_area
+
+    # 最近一次装箱的覆盖率：已装入物品的总面积 / (箱子宽度 * 最大装载长度)
+    @property
+    def coverage(self):
+        if self.max_length == 0:
+            return 0.0
+        return self.RPNXY.placed_area / (self.WIDTH * self.max_length)
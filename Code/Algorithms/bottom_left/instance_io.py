@@ -0,0 +1,73 @@
+import glob
+import os
+import numpy as np
+
+
+# 读取Test_cases格式的算例文件：
+#   Given width: 100
+#   Number of rectangles: 10
+#   Width	Height
+#   66	21
+#   ...
+# 第一次读取时整体解析文本，并在同一目录下写一个二进制缓存文件（.npy格式），之后直接内存映射该文件，不再解析文本。
+# 缓存文件名中包含文本文件的大小和修改时间，文本文件改动后缓存自动失效并重新生成
+# 也可以直接读取二进制格式的算例（.npy文件，格式与缓存文件相同，例如DataGeneration/data_generation.py生成的文件）
+# 输入filename：  算例文件路径
+# 输入cache：     是否使用和生成二进制缓存文件
+# 输出：  (箱子宽度，矩形数量，各个物品[宽度，高度]组成的int32数组)
+def read_input_from_file(filename, cache=True):
+    if filename.endswith('.npy'):
+        return read_binary(filename)
+    if not cache:
+        return parse_text(filename)
+    path = sidecar_path(filename)
+    if os.path.exists(path):
+        return read_binary(path)
+    given_width, number_of_rectangles, items = parse_text(filename)
+    write_sidecar(filename, path, given_width, number_of_rectangles, items)
+    return given_width, number_of_rectangles, items
+
+
+# 内存映射读取二进制格式：第0行为[箱子宽度，矩形数量]，之后每行为一个物品
+def read_binary(path):
+    data = np.load(path, mmap_mode='r')
+    return int(data[0, 0]), int(data[0, 1]), data[1:]
+
+
+# 整体解析文本：读取前三行表头后，把剩余内容一次性交给numpy解析成int32数组
+def parse_text(filename):
+    with open(filename, 'rb') as file:
+        given_width = int(file.readline().split(b':')[1])  # 第一行是箱子的宽度
+        number_of_rectangles = int(file.readline().split(b':')[1])  # 第二行是矩形的数量
+        file.readline()  # 第三行是表头
+        items = np.fromstring(file.read().decode('ascii'), dtype=np.int32, sep=' ').reshape(-1, 2)
+    return given_width, number_of_rectangles, items
+
+
+# 缓存文件路径：与文本文件在同一目录，隐藏文件名中带有文本文件的大小和修改时间
+def sidecar_path(filename):
+    st = os.stat(filename)
+    directory, base = os.path.split(filename)
+    return os.path.join(directory, f'.{base}.{st.st_size}.{st.st_mtime_ns}.npy')
+
+
+# 写缓存文件：先写临时文件再改名，避免其他进程读到不完整的文件；同时删除该文本文件过期的缓存
+def write_sidecar(filename, path, given_width, number_of_rectangles, items):
+    directory, base = os.path.split(filename)
+    for old in glob.glob(os.path.join(directory, glob.escape(f'.{base}.') + '*.npy')):
+        if old != path:
+            try:
+                os.remove(old)
+            except OSError:
+                pass
+    data = np.empty((len(items) + 1, 2), dtype=np.int32)
+    data[0] = (given_width, number_of_rectangles)
+    data[1:] = items
+    tmp = f'{path}.{os.getpid()}.tmp'
+    try:
+        with open(tmp, 'wb') as file:
+            np.save(file, data)
+        os.replace(tmp, path)
+    except OSError:
+        if os.path.exists(tmp):
+            os.remove(tmp)  # 目录不可写时只是不生成缓存
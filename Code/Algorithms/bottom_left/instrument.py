@@ -0,0 +1,180 @@
+import cProfile
+import json
+import pstats
+import sys
+import time
+from contextlib import contextmanager
+import numpy as np
+import tools
+
+
+# 可选的热点函数统计：finalPos、downHAtPoint、leftWAtPoint、overlap
+# enable()把这些函数替换成带计数的包装函数（包括其他模块用from tools import导入的同名引用），
+# disable()恢复原函数。未开启时不做任何替换，装箱代码运行的就是原函数，没有额外开销
+# 统计内容：
+#   各函数调用次数
+#   finalPos中下降/左移的迭代次数（每次迭代调用一次downHAtPoint）
+#   downHAtPoint和leftWAtPoint遍历的已装入物品数（不使用索引时），使用索引时只统计查询次数
+#   overlap判定重合（物品放不下）的次数
+#   每个物品finalPos的耗时分布（p50、p99和按2的幂分桶的直方图）
+NAMES = ('finalPos', 'downHAtPoint', 'leftWAtPoint', 'overlap')
+
+_originals = {}  # 函数名 -> 原函数，开启时非空
+_patched = []  # 被替换的(模块，属性名，原函数)
+_hooks = []  # 回调函数，参数为(函数名，参数元组，返回值，耗时纳秒)
+counters = {}
+latencies = []  # 每次finalPos的耗时（纳秒）
+iterations = []  # 每次finalPos的迭代次数
+
+
+# 清空已收集的统计
+def reset():
+    counters.clear()
+    counters.update({'finalPos_calls': 0, 'iterations': 0, 'downHAtPoint_calls': 0, 'leftWAtPoint_calls': 0,
+                     'rects_scanned': 0, 'index_queries': 0, 'overlap_calls': 0, 'overlap_rejects': 0})
+    latencies.clear()
+    iterations.clear()
+
+
+reset()
+
+
+# 添加回调，每次被统计的函数返回后调用callback(函数名，参数元组，返回值，耗时纳秒)
+def add_hook(callback):
+    _hooks.append(callback)
+
+
+def remove_hook(callback):
+    _hooks.remove(callback)
+
+
+def _call_hooks(name, args, result, elapsed):
+    for callback in _hooks:
+        callback(name, args, result, elapsed)
+
+
+def _wrap_scan(name, original):
+    def wrapper(item, Item, itemRP, RPNXY, index=None):
+        start = time.perf_counter_ns()
+        result = original(item, Item, itemRP, RPNXY, index)
+        elapsed = time.perf_counter_ns() - start
+        counters[name + '_calls'] += 1
+        if index is None:
+            counters['rects_scanned'] += len(RPNXY)
+        else:
+            counters['index_queries'] += 1
+        if name == 'downHAtPoint':
+            counters['iterations'] += 1
+        if _hooks:
+            _call_hooks(name, (item, itemRP), result, elapsed)
+        return result
+    return wrapper
+
+
+def _wrap_finalPos(original):
+    def wrapper(item, Item, itemRP, RPNXY, contour=None):
+        before = counters['iterations']
+        start = time.perf_counter_ns()
+        result = original(item, Item, itemRP, RPNXY, contour)
+        elapsed = time.perf_counter_ns() - start
+        counters['finalPos_calls'] += 1
+        latencies.append(elapsed)
+        iterations.append(counters['iterations'] - before)
+        if _hooks:
+            _call_hooks('finalPos', (item, itemRP), result, elapsed)
+        return result
+    return wrapper
+
+
+def _wrap_overlap(original):
+    def wrapper(item, Item, itemRP, RPNXY, contour=None):
+        start = time.perf_counter_ns()
+        result = original(item, Item, itemRP, RPNXY, contour)
+        elapsed = time.perf_counter_ns() - start
+        counters['overlap_calls'] += 1
+        if result:
+            counters['overlap_rejects'] += 1
+        if _hooks:
+            _call_hooks('overlap', (item, itemRP), result, elapsed)
+        return result
+    return wrapper
+
+
+# 开启统计：替换tools中的函数，以及所有已导入模块中指向这些函数的引用
+def enable():
+    if _originals:
+        return
+    wrappers = {}
+    for name in NAMES:
+        original = getattr(tools, name)
+        _originals[name] = original
+        if name == 'finalPos':
+            wrappers[name] = _wrap_finalPos(original)
+        elif name == 'overlap':
+            wrappers[name] = _wrap_overlap(original)
+        else:
+            wrappers[name] = _wrap_scan(name, original)
+    for module in list(sys.modules.values()):
+        for name, original in _originals.items():
+            if getattr(module, name, None) is original:
+                setattr(module, name, wrappers[name])
+                _patched.append((module, name, original))
+
+
+# 关闭统计，恢复原函数；已收集的统计保留到reset()
+def disable():
+    for module, name, original in _patched:
+        setattr(module, name, original)
+    _patched.clear()
+    _originals.clear()
+
+
+# 在with语句范围内开启统计
+@contextmanager
+def instrumented():
+    enable()
+    try:
+        yield
+    finally:
+        disable()
+
+
+# 用cProfile分析with语句范围内的代码，结束后按累计时间打印前limit个函数，也可以保存到path
+@contextmanager
+def profiled(path=None, limit=20):
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield profiler
+    finally:
+        profiler.disable()
+        if path:
+            profiler.dump_stats(path)
+        pstats.Stats(profiler).sort_stats('cumulative').print_stats(limit)
+
+
+# 以2的幂分桶的直方图：{桶的上界（纳秒）: 次数}
+def histogram(values):
+    if len(values) == 0:
+        return {}
+    values = np.asarray(values, dtype=np.int64)
+    buckets = np.left_shift(1, np.ceil(np.log2(np.maximum(values, 1))).astype(np.int64))
+    edges, counts = np.unique(buckets, return_counts=True)
+    return {str(int(e)): int(c) for e, c in zip(edges, counts)}
+
+
+# 汇总已收集的统计，返回可直接写成JSON的字典
+def stats():
+    result = dict(counters)
+    if latencies:
+        p50, p99 = np.percentile(latencies, [50, 99])
+        result['finalPos_latency_ns'] = {'p50': float(p50), 'p99': float(p99), 'max': int(max(latencies)),
+                                         'histogram': histogram(latencies)}
+        result['iterations_per_item'] = {'mean': float(np.mean(iterations)), 'p99': float(np.percentile(iterations, 99)),
+                                         'max': int(max(iterations))}
+    return result
+
+
+def export_json(filename):
+    with open(filename, 'w') as file:
+        json.dump(stats(), file, indent=1)
@@ -0,0 +1,70 @@
+import numpy as np
+
+
+# 装箱结果的二进制文件格式：
+#   文件头（40字节）：magic、版本号、物品数量、箱子宽度、箱子高度、覆盖率
+#   之后是物品数量个int32记录(id, x, y, w, h)，x、y为物品左下角坐标，w、h为宽度和高度
+# 整个文件一次写出，读取时用内存映射，不需要逐行解析
+LAYOUT_MAGIC = b'TPLAYOUT'
+LAYOUT_VERSION = 1
+HEADER_DTYPE = np.dtype([('magic', 'S8'), ('version', '<i4'), ('count', '<i4'),
+                         ('width', '<i8'), ('height', '<i8'), ('coverage', '<f8')])
+RECORD_DTYPE = np.dtype([('id', '<i4'), ('x', '<i4'), ('y', '<i4'), ('w', '<i4'), ('h', '<i4')])
+
+
+# 把[物品编号，右上角X，右上角Y]格式的装箱结果转换成(id, x, y, w, h)记录数组
+# 输入RPNXY：    装箱结果，每行[物品编号，X，Y]；允许旋转的引擎每行为[物品编号，X，Y，是否旋转]
+# 输入AllItem：  各个物品[宽度，高度]
+# w、h为装入时的尺寸，旋转的物品与AllItem中的宽度和高度互换
+def layout_records(RPNXY, AllItem):
+    RPNXY = np.asarray(RPNXY)
+    RPNXY = RPNXY.reshape(-1, RPNXY.shape[-1] if RPNXY.ndim == 2 else 3)
+    size = np.asarray(AllItem)[RPNXY[:, 0]]
+    if RPNXY.shape[1] == 4:
+        size = np.where(RPNXY[:, 3:4] != 0, size[:, ::-1], size)
+    records = np.empty(len(RPNXY), dtype=RECORD_DTYPE)
+    records['id'] = RPNXY[:, 0]
+    records['x'] = RPNXY[:, 1] - size[:, 0]
+    records['y'] = RPNXY[:, 2] - size[:, 1]
+    records['w'] = size[:, 0]
+    records['h'] = size[:, 1]
+    return records
+
+
+# 写出装箱结果
+# 输入filename： 输出文件路径
+# 输入records：  layout_records得到的记录数组
+# 输入width、height、coverage：箱子宽度、箱子高度和覆盖率
+def write_layout(filename, records, width, height, coverage):
+    header = np.zeros(1, dtype=HEADER_DTYPE)
+    header[0] = (LAYOUT_MAGIC, LAYOUT_VERSION, len(records), width, height, coverage)
+    with open(filename, 'wb') as file:
+        file.write(header.tobytes() + np.ascontiguousarray(records, dtype=RECORD_DTYPE).tobytes())
+
+
+# 读取装箱结果
+# 输出header：   文件头，可以按字段名访问，例如header['width']
+# 输出records：  内存映射的记录数组，可以按字段名访问，例如records['x']
+def read_layout(filename):
+    header = np.fromfile(filename, dtype=HEADER_DTYPE, count=1)[0]
+    if header['magic'] != LAYOUT_MAGIC or header['version'] != LAYOUT_VERSION:
+        raise ValueError(f"{filename} is not a layout file")
+    if header['count'] == 0:
+        return header, np.zeros(0, dtype=RECORD_DTYPE)
+    records = np.memmap(filename, dtype=RECORD_DTYPE, mode='r', offset=HEADER_DTYPE.itemsize,
+                        shape=(int(header['count']),))
+    return header, records
+
+
+# 可选的文本导出：第一行为箱子宽度、高度和覆盖率，之后每行一个物品"id x y w h"
+def export_text(filename, records, width, height, coverage):
+    with open(filename, 'w') as file:
+        file.write(f"Width: {width}\tHeight: {height}\tCoverage: {coverage:.6f}\n")
+        np.savetxt(file, np.asarray(records).view('<i4').reshape(-1, 5), fmt='%d', delimiter='\t')
+
+
+# 可选的CSV导出：列为id,x,y,w,h
+def export_csv(filename, records):
+    with open(filename, 'w') as file:
+        file.write('id,x,y,w,h\n')
+        np.savetxt(file, np.asarray(records).view('<i4').reshape(-1, 5), fmt='%d', delimiter=',')
@@ -0,0 +1,83 @@
+import sys
+from tools import Contour, Skyline, finalPos, finalPosBatch
+
+
+# 从文本流中逐行读取物品[宽度，高度]，不是两个整数的行（例如Test_cases文件的表头）直接跳过
+# 输入stream：  可迭代的文本行，例如sys.stdin或打开的文件
+# 输出：  逐个产生(宽度，高度)；宽度或高度为0时报错ValueError
+def read_items(stream):
+    for lineNo, line in enumerate(stream, 1):
+        parts = line.split()
+        if len(parts) == 2 and parts[0].isdigit() and parts[1].isdigit():
+            w, h = int(parts[0]), int(parts[1])
+            if w < 1 or h < 1:
+                raise ValueError(f"line {lineNo}: item size must be at least 1x1, got {w}x{h}")
+            yield w, h
+
+
+# 在线装箱：物品逐个到达，每到达一个就立即确定位置，不需要预先知道物品总数
+# 输入WIDTH：  箱子宽度
+# 输入items：  物品(宽度，高度)的迭代器
+# 输入rule：   'bl'使用与finalPos相同的左下角规则，'skyline'只把物品放在天际线上方最低的位置
+# 输入seal_every：bl规则下每装入多少个物品封闭一次无法到达的空洞，默认为箱子宽度的4倍
+# 输入allow_rotation：是否允许物品旋转90°，选择上边较低（相同时较靠左）的方向
+# 输出：  逐个产生(物品编号，右上角X，右上角Y)，与RPNXY的格式相同；允许旋转时再加上是否旋转
+# 只保存后续放置需要的轮廓（bl）或天际线（skyline），不保存已装入的物品，内存与物品数量无关
+def pack_stream(WIDTH, items, rule='bl', seal_every=None, allow_rotation=False):
+    if rule not in ('bl', 'skyline'):
+        raise ValueError(f"unknown rule: {rule}")
+    if rule == 'bl':
+        contour = Contour(WIDTH)
+        if seal_every is None:
+            seal_every = 4 * WIDTH
+    else:
+        skyline = Skyline(WIDTH)
+    top = 0  # 已装入物品的最高点
+    for idx, item in enumerate(items):
+        if item[0] < 1 or item[1] < 1:
+            raise ValueError(f"item {idx} size must be at least 1x1, got {item[0]}x{item[1]}")
+        cands = orientations(item, WIDTH, allow_rotation)
+        if not cands:
+            raise ValueError(f"item {idx} is wider than the bin: {min(item) if allow_rotation else item[0]} > {WIDTH}")
+        if rule == 'bl':
+            # 从高于所有已装入物品的右上角开始下降和左移，结果与从箱子右上角开始相同；两个方向一起批量移动
+            if len(cands) == 1:
+                RPs = [finalPos(cands[0][0], None, [WIDTH, top + cands[0][0][1]], (), contour)]
+            else:
+                RPs = finalPosBatch([it for it, _ in cands], None, [[WIDTH, top + it[1]] for it, _ in cands], (), contour)
+        else:
+            RPs = []
+            for (w, h), _ in cands:
+                x, y = skyline.find(w)
+                RPs.append([x + w, y + h])
+        k = 0 if len(RPs) == 1 else min(range(len(RPs)), key=lambda k: (RPs[k][1], RPs[k][0]))  # 相同时取第一个，即不旋转
+        (w, h), rot = cands[k]
+        X, Y = RPs[k]
+        if rule == 'bl':
+            contour.add((w, h), (X, Y))
+            if (idx + 1) % seal_every == 0:
+                contour.seal()
+        else:
+            skyline.add(X - w, w, Y)
+        if Y > top:
+            top = Y
+        yield (idx, X, Y, rot) if allow_rotation else (idx, X, Y)
+
+
+# 物品放得进箱子的方向[((宽度，高度)，是否旋转)]，正方形只有一个方向
+def orientations(item, WIDTH, allow_rotation=False):
+    w, h = item
+    cands = [((w, h), 0)] if w <= WIDTH else []
+    if allow_rotation and w != h and h <= WIDTH:
+        cands.append(((h, w), 1))
+    return cands
+
+
+# 用法：python online_pack.py WIDTH [bl|skyline] [rotate] < items.txt
+# 从标准输入逐行读取"宽度 高度"，每放置一个物品立即输出一行"物品编号 X Y"，允许旋转时再输出是否旋转
+if __name__ == '__main__':
+    WIDTH = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    rule = sys.argv[2] if len(sys.argv) > 2 else 'bl'
+    rotate = len(sys.argv) > 3 and sys.argv[3] == 'rotate'
+    for placement in pack_stream(WIDTH, read_items(sys.stdin), rule, allow_rotation=rotate):
+        print(*placement, flush=True)
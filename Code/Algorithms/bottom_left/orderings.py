@@ -0,0 +1,68 @@
+import sys
+import time
+import numpy as np
+from result_cache import cached_try_pack
+
+
+# 确定性的装箱顺序组合：按物品的某个尺寸从大到小排序，各跑一次装箱，取覆盖率最高的一个
+# 几个好的排序顺序通常比成千上万次随机顺序效果更好，而且只需要几次装箱
+# 排序键：名称 -> 由宽度w、高度h（int64数组）计算排序值的函数
+ORDERING_KEYS = {
+    'height': lambda w, h: h,
+    'width': lambda w, h: w,
+    'area': lambda w, h: w * h,
+    'perimeter': lambda w, h: w + h,
+    'max_side': lambda w, h: np.maximum(w, h),
+}
+
+
+# 计算各个排序顺序
+# 输入AllItem： 各个物品[宽度，高度]
+# 输入names：   使用的排序键名称，默认为ORDERING_KEYS中的全部
+# 输出：  {名称：物品编号数组}，按排序值从大到小；排序值相同时先按高度、再按宽度从大到小，最后按编号从小到大
+def sort_orders(AllItem, names=None):
+    AllItem = np.asarray(AllItem, dtype=np.int64)
+    w, h = AllItem[:, 0], AllItem[:, 1]
+    orders = {}
+    for name in names or ORDERING_KEYS:
+        key = ORDERING_KEYS[name](w, h)
+        orders[name] = np.lexsort((-w, -h, -key))  # lexsort是稳定排序，最后一个键为主键
+    return orders
+
+
+# 用同一个装箱引擎依次尝试各个排序顺序，引擎的预处理和缓冲区在各次装箱之间复用
+# 输入packer：  BottomLeftPacker
+# 输入orders：  {名称：装箱顺序}，默认为sort_orders(packer.AllItem)
+# 输入cache：   ResultCache，为None时不使用缓存
+# 输出results： [(名称，是否装入所有物品，最大装载长度，覆盖率)]，与orders的顺序相同
+# 输出best：    装入所有物品、覆盖率最高的一项(名称，最大装载长度，覆盖率，装箱结果的记录数组)；都没有装入时为None
+def pack_portfolio(packer, orders=None, cache=None):
+    if orders is None:
+        orders = sort_orders(packer.AllItem)
+    results = []
+    best = None
+    for name, order in orders.items():
+        packed, length, coverage, records = cached_try_pack(cache, packer, order)
+        results.append((name, packed, length, coverage))
+        if packed and (best is None or coverage > best[2]):  # 覆盖率相同时保留先尝试的顺序
+            best = (name, length, coverage, records)
+    return results, best
+
+
+if __name__ == '__main__':
+    from bl_packer import BottomLeftPacker
+    from instance_io import read_input_from_file
+
+    filename = sys.argv[1] if len(sys.argv) > 1 else 'test_size_10000_dist_1.txt'
+    WIDTH, itemNum, AllItem = read_input_from_file(filename)
+    print(f"WIDTH = {WIDTH}\t Number of items: {itemNum}")
+
+    start_time = time.perf_counter()
+    packer = BottomLeftPacker(WIDTH, AllItem)
+    results, best = pack_portfolio(packer)
+    execution_time = time.perf_counter() - start_time
+    for name, packed, length, coverage in results:
+        print(f"{name:>10}: Height: {length}\t Coverage Ratio: {coverage:.4f}" + ("" if packed else "\t (not all packed)"))
+    if best is not None:
+        print(f"Best ordering: {best[0]}\t Height: {best[1]}\t Coverage Ratio: {best[2]:.4f}")
+    print(f"执行时间: {execution_time:.4f} 秒")
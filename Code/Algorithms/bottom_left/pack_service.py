@@ -0,0 +1,404 @@
+import argparse
+import asyncio
+import os
+import signal
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import numpy as np
+from bl_packer import BottomLeftPacker
+from bestfit_pack import bestfit
+from orderings import pack_portfolio
+from layout_io import RECORD_DTYPE, layout_records
+from instance_io import read_input_from_file
+
+
+# 本地装箱服务：常驻进程，通过Unix socket（或localhost TCP）接收装箱请求，在预先启动的进程池中装箱，结果分块流式返回
+# 每个请求不再需要新建Python进程、导入pandas/matplotlib和解析文本文件，适合一次构建提交上百个小任务的图集工具
+#
+# 请求：REQUEST_DTYPE请求头，之后是count个int32的[宽度，高度]
+# 响应：RESPONSE_DTYPE响应头，之后是count个layout_io的(id, x, y, w, h)记录，按装入顺序，每STREAM_CHUNK个记录发送一次；
+#      status不为0时count为错误信息（UTF-8）的字节数，之后是错误信息
+# 同一连接上可以连续发送多个请求，不必等待响应；响应按完成的先后返回，用请求编号id对应
+#
+# 小批量合并：有空闲进程时请求立即发送，不等待；所有进程都忙时，新到的请求排队，
+# 某个进程空出来时排队的请求合并成一批（物品总数不超过BATCH_ITEMS）一起发送，减少进程间通信的次数
+# 空闲时单个请求的延迟最低，负载高时自动合并
+REQUEST_MAGIC = b'TPRQ'
+RESPONSE_MAGIC = b'TPRS'
+REQUEST_DTYPE = np.dtype([('magic', 'S4'), ('id', '<u4'), ('algorithm', 'u1'), ('rotate', 'u1'),
+                          ('width', '<i4'), ('count', '<i4')])
+RESPONSE_DTYPE = np.dtype([('magic', 'S4'), ('id', '<u4'), ('status', 'u1'), ('count', '<i4'),
+                           ('height', '<i8'), ('coverage', '<f8')])
+ALGORITHMS = ('bestfit', 'bl', 'portfolio')  # 请求头中algorithm为在此元组中的下标
+STATUS_OK, STATUS_ERROR = 0, 1
+BATCH_ITEMS = 2000  # 合并成一批的请求的物品总数上限；物品数不少于此值的请求单独发送
+STREAM_CHUNK = 1024  # 每次发送的记录数
+DEFAULT_SOCKET = 'pack_service.sock'
+
+
+# 装一个算例
+# 输入job：  (算法名称，箱子宽度，各个物品[宽度，高度]，是否允许旋转)
+# 输出：  (最大装载长度，覆盖率，装箱结果的(id, x, y, w, h)记录数组)；物品没有全部装入时报错ValueError
+def pack_job(job):
+    algorithm, width, AllItem, allow_rotation = job
+    AllItem = np.asarray(AllItem)
+    if len(AllItem) == 0:
+        return 0, 0.0, np.zeros(0, dtype=RECORD_DTYPE)
+    if AllItem.min() < 1:
+        i = int(AllItem.min(axis=1).argmin())
+        raise ValueError(f"item {i} size must be at least 1x1, got {AllItem[i, 0]}x{AllItem[i, 1]}")
+    minSide = AllItem.min(axis=1) if allow_rotation else AllItem[:, 0]
+    if minSide.max() > width:
+        i = int(minSide.argmax())
+        raise ValueError(f"item {i} is wider than the bin: {minSide[i]} > {width}")
+    if algorithm == 'bestfit':
+        RPNXY, height = bestfit(width, AllItem, allow_rotation)
+        area = int((AllItem[:, 0].astype(np.int64) * AllItem[:, 1]).sum())
+        return int(height), area / (width * height), layout_records(RPNXY, AllItem)
+    packer = BottomLeftPacker(width, AllItem, allow_rotation)
+    if algorithm == 'portfolio':
+        _, best = pack_portfolio(packer)
+        if best is None:
+            raise ValueError("no ordering packed every item")
+        _, height, coverage, records = best
+        return int(height), coverage, records
+    if algorithm == 'bl':
+        if not packer.try_pack():
+            raise ValueError(f"only {int(packer.flagItem.sum())} of {packer.itemNum} items were packed")
+        return int(packer.max_length), packer.coverage, layout_records(packer.records(), AllItem)
+    raise ValueError(f"unknown algorithm: {algorithm}")
+
+
+# 子进程任务：依次装一批算例，某个算例出错不影响同一批的其他算例
+# 输出：  各算例的(STATUS_OK，最大装载长度，覆盖率，记录数组)或(STATUS_ERROR，错误信息)
+def pack_batch(jobs):
+    results = []
+    for job in jobs:
+        try:
+            results.append((STATUS_OK,) + pack_job(job))
+        except Exception as e:
+            results.append((STATUS_ERROR, f"{type(e).__name__}: {e}"))
+    return results
+
+
+# 子进程初始化：各个装箱引擎已随本模块导入，再用一个小算例把每个引擎运行一遍，第一个请求不再付出首次调用的开销
+# 子进程忽略Ctrl-C，由服务进程关闭进程池
+def init_worker():
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    items = np.array([[2, 1], [1, 2]], dtype=np.int32)
+    for algorithm in ALGORITHMS:
+        pack_job((algorithm, 3, items, True))
+
+
+# 预热任务：返回子进程的进程号
+def worker_pid():
+    return os.getpid()
+
+
+class PackService:
+    # 输入workers：  进程池的进程数，默认为CPU核数
+    def __init__(self, workers=None, batch_items=BATCH_ITEMS):
+        self.workers = workers or os.cpu_count()
+        self.batch_items = batch_items
+        self.executor = ProcessPoolExecutor(self.workers, initializer=init_worker)
+        self.queue = deque()  # 等待空闲进程的(job，future)
+        self.busy = 0  # 正在进程池中装箱的批数
+        self.requests = 0
+        self.batches = 0
+        self.restarts = 0
+
+    # 启动子进程并等待初始化完成，之后的请求不再等待进程启动
+    async def start(self):
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*[loop.run_in_executor(self.executor, worker_pid) for _ in range(self.workers)])
+
+    def close(self):
+        self.executor.shutdown()
+
+    # 提交一个算例，返回装箱结果的future
+    def submit(self, job):
+        future = asyncio.get_running_loop().create_future()
+        self.requests += 1
+        self.queue.append((job, future))
+        self._dispatch()
+        return future
+
+    # 有空闲进程时，把排队的请求按物品总数分批发送
+    def _dispatch(self):
+        while self.queue and self.busy < self.workers:
+            batch = []
+            items = 0
+            while self.queue and (not batch or items + len(self.queue[0][0][2]) <= self.batch_items):
+                job, future = self.queue.popleft()
+                batch.append((job, future))
+                items += len(job[2])
+            executor = self.executor
+            try:
+                done = asyncio.get_running_loop().run_in_executor(executor, pack_batch, [job for job, _ in batch])
+            except BrokenProcessPool as e:  # 进程池已损坏（例如某个子进程被杀死），本批失败，换一个新的进程池
+                self._fail(batch, e)
+                self._restart(executor)
+                continue
+            self.busy += 1
+            self.batches += 1
+            done.add_done_callback(lambda done, batch=batch, executor=executor: self._finish(batch, executor, done))
+
+    def _finish(self, batch, executor, done):
+        self.busy -= 1
+        if done.cancelled():  # 进程池重建时取消了尚未开始的任务
+            self._fail(batch, BrokenProcessPool("worker pool was restarted"))
+        elif done.exception() is not None:  # 子进程异常退出等，整批失败
+            self._fail(batch, done.exception())
+            if isinstance(done.exception(), BrokenProcessPool):
+                self._restart(executor)
+        else:
+            for (_, future), result in zip(batch, done.result()):
+                if not future.done():
+                    future.set_result(result)
+        self._dispatch()
+
+    # 整批请求以STATUS_ERROR结束
+    def _fail(self, batch, error):
+        result = (STATUS_ERROR, f"{type(error).__name__}: {error}")
+        for _, future in batch:
+            if not future.done():
+                future.set_result(result)
+
+    # 用新的进程池（重新运行init_worker）代替损坏的executor；同一个进程池上的多批任务失败时只重建一次
+    def _restart(self, executor):
+        if executor is not self.executor:
+            return
+        executor.shutdown(wait=False, cancel_futures=True)
+        self.executor = ProcessPoolExecutor(self.workers, initializer=init_worker)
+        self.restarts += 1
+
+    # 处理一个连接：逐个读取请求，每个请求在独立的任务中等待结果，响应写出时加锁，不同请求的数据不会交错
+    async def handle(self, reader, writer):
+        lock = asyncio.Lock()
+        tasks = set()
+        try:
+            while True:
+                try:
+                    head = await reader.readexactly(REQUEST_DTYPE.itemsize)
+                except asyncio.IncompleteReadError:  # 客户端关闭连接
+                    break
+                header = np.frombuffer(head, dtype=REQUEST_DTYPE)[0]
+                if header['magic'] != REQUEST_MAGIC:
+                    break
+                count = int(header['count'])
+                items = np.frombuffer(await reader.readexactly(8 * count), dtype='<i4').reshape(count, 2)
+                task = asyncio.create_task(self.respond(header, items, writer, lock))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+        finally:
+            writer.close()
+
+    async def respond(self, header, items, writer, lock):
+        algorithm = int(header['algorithm'])
+        if algorithm < len(ALGORITHMS):
+            job = (ALGORITHMS[algorithm], int(header['width']), items, bool(header['rotate']))
+            result = await self.submit(job)
+        else:
+            result = (STATUS_ERROR, f"ValueError: unknown algorithm: {algorithm}")
+        response = np.zeros(1, dtype=RESPONSE_DTYPE)
+        if result[0] == STATUS_OK:
+            _, height, coverage, records = result
+            response[0] = (RESPONSE_MAGIC, header['id'], STATUS_OK, len(records), height, coverage)
+        else:
+            message = result[1].encode()
+            response[0] = (RESPONSE_MAGIC, header['id'], STATUS_ERROR, len(message), 0, 0.0)
+        async with lock:
+            writer.write(response.tobytes())
+            if result[0] == STATUS_OK:
+                for k in range(0, len(records), STREAM_CHUNK):
+                    writer.write(records[k:k + STREAM_CHUNK].tobytes())
+                    await writer.drain()
+            else:
+                writer.write(message)
+            await writer.drain()
+
+    def report(self):
+        return f"Requests: {self.requests}\t batches: {self.batches}\t workers: {self.workers}\t restarts: {self.restarts}"
+
+
+# 启动服务并一直运行
+# 输入path：  Unix socket路径；给出port时改为监听localhost的TCP端口（例如在Windows上）
+async def serve(path=DEFAULT_SOCKET, port=None, workers=None):
+    service = PackService(workers)
+    await service.start()
+    if port is not None:
+        server = await asyncio.start_server(service.handle, '127.0.0.1', port)
+        address = f"127.0.0.1:{port}"
+    else:
+        if os.path.exists(path):
+            os.remove(path)
+        server = await asyncio.start_unix_server(service.handle, path)
+        address = path
+    print(f"Packing service listening on {address}\t workers: {service.workers}")
+    stop = asyncio.Event()  # 收到SIGINT或SIGTERM时停止服务
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            asyncio.get_running_loop().add_signal_handler(sig, stop.set)
+        except NotImplementedError:  # Windows上没有，Ctrl-C时asyncio.run取消本任务
+            pass
+    try:
+        async with server:
+            await stop.wait()
+    finally:
+        print(service.report())
+        service.close()
+        if port is None and os.path.exists(path):
+            os.remove(path)
+
+
+# 装箱服务的客户端，同一连接上可以同时发出多个请求
+class PackClient:
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.streams = {}  # 请求编号 -> 接收该请求响应的队列
+        self.next_id = 0
+        self.receiver = asyncio.create_task(self._receive())
+
+    @classmethod
+    async def connect(cls, path=DEFAULT_SOCKET, port=None):
+        if port is not None:
+            reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        else:
+            reader, writer = await asyncio.open_unix_connection(path)
+        return cls(reader, writer)
+
+    # 接收响应，按请求编号放入对应的队列：先放(最大装载长度，覆盖率)，再逐块放记录数组，最后放None
+    async def _receive(self):
+        try:
+            while True:
+                head = await self.reader.readexactly(RESPONSE_DTYPE.itemsize)
+                header = np.frombuffer(head, dtype=RESPONSE_DTYPE)[0]
+                stream = self.streams.pop(int(header['id']))
+                count = int(header['count'])
+                if header['status'] != STATUS_OK:
+                    message = (await self.reader.readexactly(count)).decode()
+                    stream.put_nowait(RuntimeError(message))
+                    continue
+                stream.put_nowait((int(header['height']), float(header['coverage'])))
+                for k in range(0, count, STREAM_CHUNK):
+                    n = min(STREAM_CHUNK, count - k)
+                    data = await self.reader.readexactly(n * RECORD_DTYPE.itemsize)
+                    stream.put_nowait(np.frombuffer(data, dtype=RECORD_DTYPE))
+                stream.put_nowait(None)
+        except (asyncio.IncompleteReadError, ConnectionError) as e:  # 服务关闭了连接，未完成的请求全部失败
+            for stream in self.streams.values():
+                stream.put_nowait(ConnectionError(f"packing service closed the connection: {e}"))
+            self.streams.clear()
+
+    async def _request(self, AllItem, width, algorithm, allow_rotation):
+        if self.receiver.done():
+            raise ConnectionError("packing service closed the connection")
+        items = np.ascontiguousarray(AllItem, dtype='<i4').reshape(-1, 2)
+        header = np.zeros(1, dtype=REQUEST_DTYPE)
+        header[0] = (REQUEST_MAGIC, self.next_id, ALGORITHMS.index(algorithm), allow_rotation, width, len(items))
+        stream = self.streams[self.next_id] = asyncio.Queue()
+        self.next_id = (self.next_id + 1) & 0xFFFFFFFF
+        self.writer.write(header.tobytes() + items.tobytes())
+        await self.writer.drain()
+        first = await stream.get()
+        if isinstance(first, Exception):
+            raise first
+        return first, stream
+
+    # 装一个算例，记录数组到达一块就产生一块，按装入顺序
+    # 输入AllItem：  各个物品[宽度，高度]
+    # 输入algorithm：ALGORITHMS中的一个
+    async def pack_stream(self, AllItem, width, algorithm='bestfit', allow_rotation=False):
+        _, stream = await self._request(AllItem, width, algorithm, allow_rotation)
+        while (chunk := await stream.get()) is not None:
+            if isinstance(chunk, Exception):
+                raise chunk
+            yield chunk
+
+    # 装一个算例
+    # 输出：  (最大装载长度，覆盖率，装箱结果的(id, x, y, w, h)记录数组)
+    async def pack(self, AllItem, width, algorithm='bestfit', allow_rotation=False):
+        (height, coverage), stream = await self._request(AllItem, width, algorithm, allow_rotation)
+        chunks = []
+        while (chunk := await stream.get()) is not None:
+            if isinstance(chunk, Exception):
+                raise chunk
+            chunks.append(chunk)
+        records = np.concatenate(chunks) if chunks else np.zeros(0, dtype=RECORD_DTYPE)
+        return height, coverage, records
+
+    async def close(self):
+        self.writer.close()
+        await self.writer.wait_closed()
+        self.receiver.cancel()
+
+
+# 与PackClient接口相同的本地替身，在当前进程中直接装箱，不需要启动服务，供测试使用
+class LocalPackClient:
+    async def pack_stream(self, AllItem, width, algorithm='bestfit', allow_rotation=False):
+        _, _, records = await self.pack(AllItem, width, algorithm, allow_rotation)
+        for k in range(0, len(records), STREAM_CHUNK):
+            yield records[k:k + STREAM_CHUNK]
+
+    async def pack(self, AllItem, width, algorithm='bestfit', allow_rotation=False):
+        if algorithm not in ALGORITHMS:
+            raise RuntimeError(f"ValueError: unknown algorithm: {algorithm}")
+        result = pack_batch([(algorithm, width, np.asarray(AllItem, dtype=np.int32), allow_rotation)])[0]
+        if result[0] != STATUS_OK:
+            raise RuntimeError(result[1])
+        return result[1:]
+
+    async def close(self):
+        pass
+
+
+# 延迟测试：从算例中切出jobs个各有size个物品的小算例，同时提交给服务，统计每个请求的延迟
+async def bench(filename, jobs, size, algorithm, path=DEFAULT_SOCKET, port=None):
+    WIDTH, itemNum, AllItem = read_input_from_file(filename)
+    AllItem = np.asarray(AllItem)
+    client = await PackClient.connect(path, port)
+
+    async def timed(k):
+        start = time.perf_counter()
+        await client.pack(AllItem[(k * size) % itemNum:][:size], WIDTH, algorithm)
+        return time.perf_counter() - start
+
+    start_time = time.perf_counter()
+    latency = np.array(await asyncio.gather(*[timed(k) for k in range(jobs)])) * 1000
+    execution_time = time.perf_counter() - start_time
+    await client.close()
+    print(f"Jobs: {jobs}\t items per job: {size}\t algorithm: {algorithm}\t 执行时间: {execution_time:.4f} 秒")
+    print(f"Latency (ms): median {np.median(latency):.2f}\t p95 {np.percentile(latency, 95):.2f}\t max {latency.max():.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='本地装箱服务')
+    sub = parser.add_subparsers(dest='command', required=True)
+    p = sub.add_parser('serve', help='启动服务')
+    p.add_argument('--workers', type=int, default=None, help='进程数，默认为CPU核数')
+    p = sub.add_parser('bench', help='向运行中的服务提交多个小算例，统计延迟')
+    p.add_argument('filename', help='算例文件（Test_cases格式的.txt或.npy）')
+    p.add_argument('--jobs', type=int, default=200, help='请求数')
+    p.add_argument('--size', type=int, default=50, help='每个请求的物品数')
+    p.add_argument('--algorithm', choices=ALGORITHMS, default='bestfit', help='装箱算法')
+    for p in sub.choices.values():
+        p.add_argument('--socket', default=DEFAULT_SOCKET, help='Unix socket路径')
+        p.add_argument('--port', type=int, default=None, help='改用localhost的TCP端口')
+    args = parser.parse_args()
+
+    if args.command == 'serve':
+        try:
+            asyncio.run(serve(args.socket, args.port, args.workers))
+        except KeyboardInterrupt:
+            pass
+    else:
+        asyncio.run(bench(args.filename, args.jobs, args.size, args.algorithm, args.socket, args.port))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,154 @@
+import sys
+import numpy as np
+from layout_io import layout_records, read_layout
+
+
+# 装箱结果的绘制，适用于上万个物品：
+#   collection —— 所有矩形放在一个PolyCollection中一次绘制
+#   raster     —— 直接把矩形填充到NumPy图像数组中，再作为一张图片显示或保存
+# 物品编号和坐标标注按细节层次显示：只给在图上足够大、文字放得下的物品加标注，并限制标注数量
+# 不显示窗口时使用matplotlib的Figure对象直接保存PNG，不需要图形界面
+# matplotlib只在绘制时导入，装箱本身不需要
+MIN_LABEL_PIXELS = 14  # 物品短边至少有这么多像素才标注编号
+MAX_LABELS = 300  # 最多标注的物品数量
+MAX_EQUAL_ASPECT = 4  # 箱子长宽比超过该值时不再等比例显示，否则细长的箱子只占图中很窄的一条
+
+
+# 每个物品的颜色，由物品编号和随机种子决定，同一个物品在不同的图中颜色相同
+def item_colors(ids, seed=0):
+    ids = np.asarray(ids)
+    if len(ids) == 0:
+        return np.zeros((0, 3))
+    return np.random.default_rng(seed).random((int(ids.max()) + 1, 3))[ids]
+
+
+# 需要标注的物品：宽度和高度的像素数都不小于min_pixels，超过max_labels个时只保留面积最大的
+# 输入sx、sy：  x和y方向上每个坐标单位对应的像素数
+def label_mask(records, sx, sy, min_pixels=MIN_LABEL_PIXELS, max_labels=MAX_LABELS):
+    mask = (records['w'] * sx >= min_pixels) & (records['h'] * sy >= min_pixels)
+    if mask.sum() > max_labels:
+        area = np.where(mask, records['w'].astype(np.int64) * records['h'], -1)
+        mask = np.zeros(len(records), dtype=bool)
+        mask[np.argsort(-area, kind='stable')[:max_labels]] = True
+    return mask
+
+
+# 在已有的坐标轴ax上绘制装箱结果
+# 输入records：  layout_records得到的记录数组(id, x, y, w, h)
+# 输入colors：   各物品的颜色，默认为item_colors
+# 输入labels：   'auto'按细节层次标注，True标注所有物品，False不标注
+# 输入mode：     'collection'或'raster'，raster按坐标轴的像素大小填充图像
+def draw_layout(ax, records, colors=None, labels='auto', mode='collection'):
+    from matplotlib.collections import PolyCollection
+
+    if colors is None:
+        colors = item_colors(records['id'])
+    x, y = records['x'].astype(float), records['y'].astype(float)
+    w, h = records['w'].astype(float), records['h'].astype(float)
+    # x和y方向上每个坐标单位的像素数；坐标轴按等比例显示时，两个方向都取较小的一个
+    x_lim, y_lim = ax.get_xlim(), ax.get_ylim()
+    sx = ax.bbox.width / (x_lim[1] - x_lim[0])
+    sy = ax.bbox.height / (y_lim[1] - y_lim[0])
+    if ax.get_aspect() == 1.0:
+        sx = sy = min(sx, sy)
+
+    if mode == 'raster':
+        width, height = x_lim[1] - x_lim[0], y_lim[1] - y_lim[0]
+        shape = (max(1, int(np.ceil(height * sy))), max(1, int(np.ceil(width * sx))))
+        image = rasterize(records, width, height, shape, colors)
+        ax.imshow(image, extent=(x_lim[0], x_lim[1], y_lim[0], y_lim[1]), interpolation='nearest',
+                  aspect=ax.get_aspect(), zorder=2)
+    else:
+        verts = np.stack([np.column_stack((x, y)), np.column_stack((x + w, y)),
+                          np.column_stack((x + w, y + h)), np.column_stack((x, y + h))], axis=1)
+        # 矩形太小时边框会盖住填充色，不画边框
+        linewidth = 1 if len(records) == 0 or np.median(np.minimum(w * sx, h * sy)) >= 4 else 0
+        ax.add_collection(PolyCollection(verts, facecolors=colors, edgecolors='black', linewidths=linewidth,
+                                         alpha=0.7, zorder=2))
+
+    if labels is False:
+        return
+    mask = np.ones(len(records), dtype=bool) if labels is True else label_mask(records, sx, sy)
+    for k in np.flatnonzero(mask):
+        ax.text(x[k] + w[k] / 2, y[k] + h[k] / 2, f"{records['id'][k]}", color='white', ha='center', va='center',
+                fontsize=10, zorder=3)
+        # 右上角坐标只在物品足够大时标注
+        if labels is True or min(w[k] * sx, h[k] * sy) >= 3 * MIN_LABEL_PIXELS:
+            X, Y = int(x[k] + w[k]), int(y[k] + h[k])
+            ax.text(X, Y, f'({X}, {Y})', color='blue', fontsize=8, ha='left', va='bottom', zorder=3)
+
+
+# 把装箱结果填充到RGB图像数组中（y轴向上，第0行为箱子顶部）
+# 输入shape：  图像的(高度像素，宽度像素)
+# 输出：  float32数组，形状为(高度像素，宽度像素，3)
+# 矩形在两个方向上都超过3个像素时才画黑色边框，否则只填充颜色
+def rasterize(records, width, height, shape, colors=None, background=1.0):
+    if colors is None:
+        colors = item_colors(records['id'])
+    H, W = shape
+    sx, sy = W / width, H / height
+    image = np.full((H, W, 3), background, dtype=np.float32)
+    x0 = np.round(records['x'] * sx).astype(np.int64)
+    y0 = np.round(records['y'] * sy).astype(np.int64)
+    x1 = np.maximum(np.round((records['x'] + records['w']) * sx).astype(np.int64), x0 + 1)
+    y1 = np.maximum(np.round((records['y'] + records['h']) * sy).astype(np.int64), y0 + 1)
+    border = (x1 - x0 > 3) & (y1 - y0 > 3)
+    for k in range(len(records)):
+        if border[k]:
+            image[y0[k]:y1[k], x0[k]:x1[k]] = 0
+            image[y0[k] + 1:y1[k] - 1, x0[k] + 1:x1[k] - 1] = colors[k]
+        else:
+            image[y0[k]:y1[k], x0[k]:x1[k]] = colors[k]
+    return image[::-1]
+
+
+# 绘制装箱结果
+# 输入records：   layout_records得到的记录数组(id, x, y, w, h)
+# 输入width、height、coverage：箱子宽度、长度和覆盖率
+# 输入filename：  保存的PNG文件路径，为None时不保存
+# 输入show：      是否用pyplot显示窗口；为False时不使用图形界面
+# 输入mode：      'collection'或'raster'
+# 输入aspect：    坐标轴比例，默认箱子长宽比不超过MAX_EQUAL_ASPECT时等比例显示，否则拉伸到整个图
+# 输出：  matplotlib的Figure对象
+def render_layout(records, width, height, coverage=None, filename=None, show=False, mode='collection',
+                  labels='auto', figsize=(10, 10), dpi=100, aspect=None):
+    if show:
+        import matplotlib.pyplot as plt
+        fig, ax = plt.subplots(figsize=figsize, dpi=dpi)
+    else:
+        from matplotlib.figure import Figure
+        fig = Figure(figsize=figsize, dpi=dpi)
+        ax = fig.subplots()
+
+    # 绘制箱子的边界
+    ax.set_xlim(0, width)
+    ax.set_ylim(0, height)
+    if aspect is None:
+        aspect = 'equal' if max(width, height) <= MAX_EQUAL_ASPECT * min(width, height) else 'auto'
+    ax.set_aspect(aspect, adjustable='box')
+    if coverage is not None:
+        ax.set_title(f'coverage ratio: {coverage:.4f}')
+    ax.set_xlabel('X Coordinate')
+    ax.set_ylabel('Y Coordinate')
+    ax.grid(True, which='both', linestyle='--', linewidth=0.5)
+
+    draw_layout(ax, records, labels=labels, mode=mode)
+    if filename:
+        fig.savefig(filename)
+    if show:
+        plt.show()
+    return fig
+
+
+# 用[物品编号，X，Y]格式的装箱结果和物品尺寸绘制，参数与render_layout相同
+def render_packing(RPNXY, AllItem, width, height, coverage=None, **kwargs):
+    return render_layout(layout_records(RPNXY, AllItem), width, height, coverage, **kwargs)
+
+
+# 用法：python render.py layout.bin out.png [collection|raster]
+# 读取layout_io写出的装箱结果文件并保存为PNG，不需要图形界面
+if __name__ == '__main__':
+    header, records = read_layout(sys.argv[1])
+    render_layout(records, int(header['width']), int(header['height']), float(header['coverage']),
+                  filename=sys.argv[2] if len(sys.argv) > 2 else 'layout.png',
+                  mode=sys.argv[3] if len(sys.argv) > 3 else 'collection')
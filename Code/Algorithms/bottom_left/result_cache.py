@@ -0,0 +1,146 @@
+import hashlib
+import os
+import numpy as np
+from layout_io import layout_records, write_layout, read_layout
+
+
+# 装箱结果的磁盘缓存，按内容寻址：
+#   键为(箱子宽度，物品数组，装箱顺序，算法及其参数)的SHA-256，值为layout_io格式的装箱结果文件
+#   命中时更新文件的修改时间，总大小超过上限时按修改时间从旧到新删除（LRU），删到上限的90%为止
+# 同一个目录可以被多个进程同时使用：文件先写到临时文件再改名，读到的总是完整的文件
+# 每个进程只知道自己写入的大小，所以每写入RESCAN_EVERY个文件重新统计一次整个目录，
+# 多个进程共用目录时超出上限的部分不超过每个进程RESCAN_EVERY个文件
+CACHE_VERSION = 2  # 装箱算法的结果或键的计算方法改变时加1，旧的缓存自动失效
+DEFAULT_MAX_BYTES = 256 << 20
+RESCAN_EVERY = 64
+
+
+# numpy标量转换成Python数值，np.int64(5)与5的键相同
+def _plain(value):
+    return value.item() if isinstance(value, np.generic) else value
+
+
+class ResultCache:
+    # 输入directory：  缓存目录，不存在时自动创建
+    # 输入max_bytes：  缓存文件总大小的上限（字节）
+    def __init__(self, directory, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+        self.size = sum(size for _, _, size in self._entries())
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.puts = 0
+
+    # 缓存键
+    # 输入order：   装箱顺序（物品编号序列），None表示文件中的顺序；也可以直接给出随机种子
+    # 输入params：  算法参数，例如bin_length
+    # 物品数组按原来的数据类型和字节计算，宽度和参数用repr，数值不同（包括小数部分不同）时键一定不同
+    def key(self, WIDTH, AllItem, order, algorithm='bl', **params):
+        h = hashlib.sha256()
+        AllItem = np.ascontiguousarray(AllItem)
+        params = sorted((name, _plain(value)) for name, value in params.items())
+        h.update(repr((CACHE_VERSION, _plain(WIDTH), AllItem.dtype.str, AllItem.shape, algorithm, params)).encode())
+        h.update(AllItem.tobytes())
+        if order is None or isinstance(order, (int, np.integer)):
+            h.update(repr(_plain(order)).encode())
+        else:
+            h.update(np.ascontiguousarray(order, dtype=np.int64).tobytes())
+        return h.hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, key[:2], key + '.layout')
+
+    # 所有缓存文件的(路径，修改时间，大小)
+    def _entries(self):
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if name.endswith('.layout'):
+                    path = os.path.join(root, name)
+                    try:
+                        st = os.stat(path)
+                    except FileNotFoundError:  # 其他进程刚刚删除
+                        continue
+                    yield path, st.st_mtime_ns, st.st_size
+
+    # 查找缓存
+    # 输出：  (文件头，记录数组)，未命中时返回None
+    def get(self, key):
+        path = self._path(key)
+        try:
+            header, records = read_layout(path)
+            records = np.array(records)  # 复制出来，不保持文件映射，文件可以被淘汰
+            os.utime(path)  # 记录最近一次使用的时间
+        except (FileNotFoundError, ValueError):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return header, records
+
+    # 写入缓存，参数与layout_io.write_layout相同
+    def put(self, key, records, width, height, coverage):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        write_layout(tmp, records, width, height, coverage)
+        self.size += os.path.getsize(tmp)
+        os.replace(tmp, path)
+        self.puts += 1
+        if self.size > self.max_bytes or self.puts % RESCAN_EVERY == 0:
+            self.evict()
+
+    # 重新统计整个目录（包括其他进程写入的文件），超过上限时按最近使用时间从旧到新删除缓存文件，
+    # 直到总大小不超过上限的90%
+    def evict(self):
+        entries = sorted(self._entries(), key=lambda e: e[1])
+        self.size = sum(size for _, _, size in entries)
+        if self.size <= self.max_bytes:
+            return
+        target = 0.9 * self.max_bytes
+        for path, _, size in entries:
+            if self.size <= target:
+                break
+            try:
+                os.remove(path)
+                self.evictions += 1
+            except FileNotFoundError:
+                pass
+            self.size -= size
+
+    # 删除所有缓存文件
+    def clear(self):
+        for path, _, _ in list(self._entries()):
+            os.remove(path)
+        self.size = 0
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {'hits': self.hits, 'misses': self.misses, 'hit_rate': self.hits / total if total else 0.0,
+                'evictions': self.evictions, 'bytes': self.size}
+
+    def report(self):
+        s = self.stats()
+        return (f"Cache hits: {s['hits']}\t misses: {s['misses']}\t hit rate: {s['hit_rate']:.2%}\t "
+                f"evictions: {s['evictions']}\t size: {s['bytes'] / 1024:.1f} KB")
+
+
+# 先查缓存再调用packer.try_pack，参数与try_pack相同
+# 输入cache：   ResultCache，为None时不使用缓存
+# 输入packer：  BottomLeftPacker
+# 输出：  (是否装入所有物品，最大装载长度，覆盖率，装箱结果的(id, x, y, w, h)记录数组)
+def cached_try_pack(cache, packer, order=None, bin_length=None):
+    if bin_length is None:
+        bin_length = packer.LENGTH
+    if cache is not None:
+        key = cache.key(packer.WIDTH, packer.AllItem, order, 'bl', bin_length=bin_length,
+                        allow_rotation=packer.allow_rotation)
+        hit = cache.get(key)
+        if hit is not None:
+            header, records = hit
+            return len(records) == packer.itemNum, int(header['height']), float(header['coverage']), records
+    packed = packer.try_pack(order, bin_length)
+    records = layout_records(packer.records(), packer.AllItem)
+    if cache is not None:
+        cache.put(key, records, packer.WIDTH, packer.max_length, packer.coverage)
+    return packed, packer.max_length, packer.coverage, records
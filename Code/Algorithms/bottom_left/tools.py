@@ -1,6 +1,6 @@
 
-from matplotlib.pyplot import axis # type: ignore
 import numpy as np # type: ignore
+from bisect import bisect_left, bisect_right
 
 def Horizontal_Lines_Intersect(line1,line2):
     # 判断两条水平线段经过竖直移动后是否会相交，如果相交，计算两条水平线段竖直距离是多少
@@ -32,6 +32,21 @@ def Horizontal_Lines_Intersect(line1,line2):
         HD=line1[1]-line2[1]
     return flag,HD
 
+# Horizontal_Lines_Intersect的批量版本：line1与lines中的每一条水平线段分别判断，5种情况与上面完全一致
+# 输入line1：  第一条线段[x1,y1,x2,y2]
+# 输入lines：  多条线段组成的数组，每行[x1,y1,x2,y2]；也可以是(x1,y1,x2,y2)四列组成的元组
+# 输出flag：  每条线段对应的相交标记数组，1相交，0不相交
+# 输出HD：  每条线段对应的竖直距离数组
+def Horizontal_Lines_Intersect_batch(line1,lines):
+    lx1,ly1,lx2,_=lines if isinstance(lines,tuple) else np.asarray(lines).T
+    c1=line1[2]<=lx1  #第一种情况
+    c2=(line1[2]>lx1)&(line1[2]<=lx2)  #第二种情况
+    c3=(line1[0]>=lx1)&(line1[0]<lx2)  #第三种情况
+    c4=line1[0]>=lx2  #第四种情况
+    flag=(~c1&(c2|c3|~c4)).astype(np.int8)
+    HD=line1[1]-ly1
+    return flag,HD
+
 ######################################
 # 根据物品右上角顶点坐标和物品宽度和高度，求出物品下端水平线段左右两端坐标[leftx,lefty,rightx,righty]
 # 输入item：  物品[宽度，高度]
@@ -49,30 +64,32 @@ def Point_Horizontal_Line(item,RPXY):
 # 输入item：   物品[宽度，高度]
 # 输入AllItem：   各个物品[宽度，高度]
 # 输入itemRP： 此时物品右上角顶点坐标[x,y]
-# 输入RPNXY：  当前箱子中所有物品右上角顶点坐标数组
+# 输入RPNXY：  当前箱子中所有物品右上角顶点坐标数组（[物品编号，X，Y]列表或装箱状态PackState）
+# 输入index：  可选的放置索引PlacedIndex（或Contour），给出时不再对RPNXY排序
 # 输出downH：  物品item在箱子内任意位置可以下降的最大高度（如果能装入当前箱子，则downH为正数；如果不能装入当前箱子，则为负数）
-def downHAtPoint(item,AllItem,itemRP,RPNXY):
+def downHAtPoint(item,AllItem,itemRP,RPNXY,index=None):
+    if index is not None:
+        return index.downHAtPoint(item,itemRP)
     bottomLine=Point_Horizontal_Line(item,itemRP)  #物品下端水平线段左右两端坐标[leftx,lefty,rightx,righty]
     RP_NUM=len(RPNXY) #箱子内物品数目
     if RP_NUM!=0:
-        sRPNXY=np.array(sorted(list(RPNXY), key=lambda x:x[2],reverse=True))#将RPNXY按照Y坐标降序排列
-        sRBPNXY=sRPNXY.copy()
-        sRBPNXY[:,1]=sRPNXY[:,1]-AllItem[sRPNXY[:,0],0]  #将RPNXY按照Y坐标降序排列后的左上角顶点坐标
-        
-        topLine=np.concatenate((sRBPNXY[:,1:3],sRPNXY[:,1:3]),axis=1)  #物品按照Y坐标降序排列后，物品上端水平线段左右两端坐标[leftx,lefty,rightx,righty]
-        # 逐个遍历sRPNXY中的物品
-        alldownH=[]  # 储存所有满足相交条件的下降距离
-        for i in range(RP_NUM):
-            #判断两条水平线段经过竖直移动后是否会相交，flag=1相交，flag=0不相交
-            #两条水平线段距离是多少，如果竖直移动后相交，HD为正数，反之为负数
-            flag,HD=Horizontal_Lines_Intersect(bottomLine,topLine[i,:])
-            if (flag==1) and (HD>=0):
-                alldownH.append(HD)
+        if isinstance(RPNXY,PackState):
+            _,x1,_,x2,y2,_=RPNXY.view()
+            topLine=(x1,y2,x2,y2)  #直接使用装箱状态中的列，不复制
+        else:
+            sRPNXY=np.asarray(RPNXY)  #批量计算取最小值，与物品顺序无关，不再按照Y坐标排序
+            sRBPNXY=sRPNXY.copy()
+            sRBPNXY[:,1]=sRPNXY[:,1]-AllItem[sRPNXY[:,0],0]  #物品左上角顶点坐标
+            topLine=np.concatenate((sRBPNXY[:,1:3],sRPNXY[:,1:3]),axis=1)  #物品上端水平线段左右两端坐标[leftx,lefty,rightx,righty]
+        #一次性判断所有物品，flag=1相交，flag=0不相交
+        #两条水平线段距离是多少，如果竖直移动后相交，HD为正数，反之为负数
+        flag,HD=Horizontal_Lines_Intersect_batch(bottomLine,topLine)
+        alldownH=HD[(flag==1)&(HD>=0)]  # 所有满足相交条件的下降距离
         # 如果不存在满足相交条件的物品，则直接下降到箱子最底端
         if len(alldownH)==0:
             downH=itemRP[1]-item[1]
         else:  # 如果存在满足相交条件的物品，则下降距离为alldownH中的最小值
-            downH=min(alldownH)
+            downH=alldownH.min()
     else:
         downH=itemRP[1]-item[1]  #此时箱子没有物品，物品直接下降到箱子底端
     return downH
@@ -105,6 +122,21 @@ def Vertical_Lines_Intersect(line1,line2):
         HD=line1[0]-line2[0]
     return flag,HD
 
+# Vertical_Lines_Intersect的批量版本：line1与lines中的每一条竖直线段分别判断，5种情况与上面完全一致
+# 输入line1：  第一条线段[topx,topy,bottomx,bottomy]
+# 输入lines：  多条线段组成的数组，每行[topx,topy,bottomx,bottomy]；也可以是四列组成的元组
+# 输出flag：  每条线段对应的相交标记数组，1相交，0不相交
+# 输出HD：  每条线段对应的水平距离数组
+def Vertical_Lines_Intersect_batch(line1,lines):
+    ltx,lty,_,lby=lines if isinstance(lines,tuple) else np.asarray(lines).T
+    c1=line1[3]>=lty  #第一种情况
+    c2=(line1[3]<lty)&(line1[3]>=lby)  #第二种情况
+    c3=(line1[1]<=lty)&(line1[1]>lby)  #第三种情况
+    c4=line1[1]<=lby  #第四种情况
+    flag=(~c1&(c2|c3|~c4)).astype(np.int8)
+    HD=line1[0]-ltx
+    return flag,HD
+
 # 根据物品右上角顶点坐标和物品宽度和高度，求出物品左端竖直线段上下两端坐标[topx,topy,bottomx,bottomy]
 # 输入item：  物品[宽度，高度]
 # 输入RPXY：物品右上角顶点坐标[x,y]
@@ -121,29 +153,32 @@ def Point_Vertical_Line(item,RPXY):
 # 输入item：   物品[宽度，高度]
 # 输入Item：   各个物品[宽度，高度]
 # 输入itemRP： 此时物品右上角顶点坐标[x,y]
-# 输入RPNXY：  当前箱子中所有物品右上角顶点坐标数组
+# 输入RPNXY：  当前箱子中所有物品右上角顶点坐标数组（[物品编号，X，Y]列表或装箱状态PackState）
+# 输入index：  可选的放置索引PlacedIndex（或Contour），给出时不再对RPNXY排序
 # 输出leftW：  物品item在箱子内任意位置可以向左移动的最大距离
-def leftWAtPoint(item,Item,itemRP,RPNXY):
+def leftWAtPoint(item,Item,itemRP,RPNXY,index=None):
+    if index is not None:
+        return index.leftWAtPoint(item,itemRP)
     leftLine=Point_Vertical_Line(item,itemRP)  #物品左端竖直线段上下两端坐标[topx,topy,bottomx,bottomy]
     RP_NUM=len(RPNXY)#箱子内物品数目
     if RP_NUM!=0:
-        sRPNXY=np.array(sorted(list(RPNXY), key=lambda x:x[0]))  #将RPNXY按照X坐标降序排列
-        sRBPNXY=sRPNXY.copy()
-        sRBPNXY[:,2]=sRPNXY[:,2]-Item[sRPNXY[:,0],1] #将RPNXY按照X坐标降序排列后的右下角顶点坐标
-        rightLine=np.concatenate((sRPNXY[:,1:3],sRBPNXY[:,1:3]),axis=1)#物品按照X坐标降序排列后，右端线段上下两端坐标[topx,topy,bottomx,bottomy]
-        #逐个遍历sRPNXY中的物品
-        allLeftW=[]  #储存所有满足相交条件的左移距离
-        for i in range(RP_NUM):
-            #判断两条竖直线经过水平移动后是否会相交，flag=1相交，flag=0不相交
-            #两条竖直线段距离是多少，如果平移动后相交，HD为正数，反之为负数
-            flag,HD=Vertical_Lines_Intersect(leftLine,rightLine[i,:])
-            if (flag==1) and (HD>=0):
-                allLeftW.append(HD)
+        if isinstance(RPNXY,PackState):
+            _,_,y1,x2,y2,_=RPNXY.view()
+            rightLine=(x2,y2,x2,y1)  #直接使用装箱状态中的列，不复制
+        else:
+            sRPNXY=np.asarray(RPNXY)  #批量计算取最小值，与物品顺序无关，不再按照X坐标排序
+            sRBPNXY=sRPNXY.copy()
+            sRBPNXY[:,2]=sRPNXY[:,2]-Item[sRPNXY[:,0],1] #物品右下角顶点坐标
+            rightLine=np.concatenate((sRPNXY[:,1:3],sRBPNXY[:,1:3]),axis=1)#物品右端线段上下两端坐标[topx,topy,bottomx,bottomy]
+        #一次性判断所有物品，flag=1相交，flag=0不相交
+        #两条竖直线段距离是多少，如果平移动后相交，HD为正数，反之为负数
+        flag,HD=Vertical_Lines_Intersect_batch(leftLine,rightLine)
+        allLeftW=HD[(flag==1)&(HD>=0)]  #所有满足相交条件的左移距离
         # 如果不存在满足相交条件的物品，则直接移动箱子最左端
         if len(allLeftW)==0:
             leftW=itemRP[0]-item[0]
         else: #如果存在满足相交条件的物品，则左移距离为allLeftW中的最小值
-            leftW=min(allLeftW)
+            leftW=allLeftW.min()
     else:
         leftW=itemRP[0]-item[0]
     return leftW
@@ -159,53 +194,429 @@ def Update_itemRP(itemRP,downH,leftW):
     return [w,h]
 # 矩形类，[x,y,width,height]左下角坐标、长和宽
 class Rectangle:
+    __slots__ = ('x', 'y', 'width', 'height')
     def __init__(self, x, y,w,h):
       self.x = x
       self.y = y
       self.width = w
       self.height = h
+
+# 装箱状态：用预先分配的int64数组按列保存已装入的物品，代替[物品编号，X，Y]组成的列表RPNXY
+# 坐标和面积都按整数保存，物品尺寸和箱子宽度必须是整数（见newIndex）
+# 各列：id物品编号，x1、y1左下角坐标，x2、y2右上角坐标，area面积；只有前num个位置有效
+# 每一列都是buf中连续的一行，add为O(1)，view返回各列前num个位置的视图，不复制
+# rot单独记录各物品是否旋转了90°（宽度和高度互换后装入）
+class PackState:
+    def __init__(self, capacity):
+        self.buf = np.zeros((6, capacity), dtype=np.int64)  # 面积可能超出int32的范围
+        self.id, self.x1, self.y1, self.x2, self.y2, self.area = self.buf
+        self.rot = np.zeros(capacity, dtype=np.int32)
+        self.num = 0
+        self.placed_area = 0  # 已装入物品的总面积，装入时累加
+        self.top = 0  # 已装入物品的最高点，装入时更新
+
+    def __len__(self):
+        return self.num
+
+    # 清空状态，保留已分配的数组
+    def reset(self):
+        self.num = 0
+        self.placed_area = 0
+        self.top = 0
+
+    # 记录物品idx（装入时的尺寸item，右上角顶点坐标itemRP，是否旋转rot）
+    def add(self, idx, item, itemRP, rot=0):
+        k = self.num
+        area = int(item[0]) * int(item[1])
+        self.buf[:, k] = (idx, itemRP[0] - item[0], itemRP[1] - item[1], itemRP[0], itemRP[1], area)
+        self.rot[k] = rot
+        self.num = k + 1
+        self.placed_area += area
+        if itemRP[1] > self.top:
+            self.top = itemRP[1]
+
+    # 各列前num个位置的视图(id, x1, y1, x2, y2, area)
+    def view(self):
+        return tuple(self.buf[:, :self.num])
+
+    # 与RPNXY格式相同的[物品编号，X，Y]数组；rotation为True时每行为[物品编号，X，Y，是否旋转]
+    def records(self, rotation=False):
+        if rotation:
+            return np.vstack((self.buf[[0, 3, 4], :self.num], self.rot[:self.num])).T
+        return self.buf[[0, 3, 4], :self.num].T
+
+# 放置索引：已装入的物品在装入时就按上端y坐标和右端x坐标插入到两个有序表中，查询时不再重新排序
+# 思路：下降时从不超过物品底边的最高上端开始向下找，第一个在水平方向上相交的物品就是最近的下方阻挡物品；
+#      左移时从不超过物品左边的最大右端开始向左找，第一个在竖直方向上相交的物品就是最近的左方阻挡物品
+class PlacedIndex:
+    def __init__(self):
+        self.topKey = []  # 各物品上端y坐标，升序
+        self.byTop = []  # 与topKey对应的物品[左x，下y，右x，上y]
+        self.rightKey = []  # 各物品右端x坐标，升序
+        self.byRight = []  # 与rightKey对应的物品[左x，下y，右x，上y]
+
+    # 清空索引，保留已分配的列表
+    def reset(self):
+        self.topKey.clear()
+        self.byTop.clear()
+        self.rightKey.clear()
+        self.byRight.clear()
+
+    # 将物品item（右上角顶点坐标itemRP）插入索引，二分查找插入位置
+    def add(self, item, itemRP):
+        x2, y2 = itemRP[0], itemRP[1]
+        rect = (x2 - item[0], y2 - item[1], x2, y2)
+        p = bisect_right(self.topKey, y2)
+        self.topKey.insert(p, y2)
+        self.byTop.insert(p, rect)
+        p = bisect_right(self.rightKey, x2)
+        self.rightKey.insert(p, x2)
+        self.byRight.insert(p, rect)
+
+    # 与downHAtPoint作用一样：物品item在itemRP位置处可以下降的最大高度
+    def downHAtPoint(self, item, itemRP):
+        x2 = itemRP[0]
+        x1, yb = x2 - item[0], itemRP[1] - item[1]
+        byTop = self.byTop
+        for k in range(bisect_right(self.topKey, yb) - 1, -1, -1):
+            r = byTop[k]
+            if r[0] < x2 and r[2] > x1:  # 水平方向相交
+                return yb - r[3]
+        return yb
+
+    # 与leftWAtPoint作用一样：物品item在itemRP位置处可以向左移动的最大距离
+    def leftWAtPoint(self, item, itemRP):
+        y2 = itemRP[1]
+        x1, y1 = itemRP[0] - item[0], y2 - item[1]
+        byRight = self.byRight
+        for k in range(bisect_right(self.rightKey, x1) - 1, -1, -1):
+            r = byRight[k]
+            if r[1] < y2 and r[3] > y1:  # 竖直方向相交
+                return x1 - r[2]
+        return x1
+
+    # 与overlap作用一样：只检查上端高于物品底边的物品
+    def overlap(self, item, itemRP):
+        x2, y2 = itemRP[0], itemRP[1]
+        x1, y1 = x2 - item[0], y2 - item[1]
+        byTop = self.byTop
+        for k in range(len(byTop) - 1, bisect_right(self.topKey, y1) - 1, -1):
+            r = byTop[k]
+            if r[0] < x2 and r[2] > x1 and r[1] < y2:
+                return 1
+        return 0
+
+# 根据箱子宽度和物品尺寸选择索引
+# 装箱状态、装箱结果文件和缓存都按整数保存坐标，非整数的尺寸直接报错，不在装箱过程中被截断
+# Contour每次查询要看物品覆盖的约w列，PlacedIndex要向下（向左）找过同一行的约WIDTH/w个物品，
+# 平均宽度的平方与箱子宽度之比超过PLACED_INDEX_RATIO时（宽物品或很宽的箱子）使用PlacedIndex，否则使用Contour
+# 例如Test_cases中dist_3的物品平均宽度约为箱子的3/4，几乎每个物品独占一行，PlacedIndex快约4倍；
+# dist_1、dist_2使用Contour，箱子和物品放大10倍后二者相当
+# 允许旋转时物品多以较短的一边为宽度装入，按较短边的平均值计算
+PLACED_INDEX_RATIO = 50
+def newIndex(width, Item, allow_rotation=False):
+    Item = np.asarray(Item)
+    if not isinstance(width, (int, np.integer)) or not np.issubdtype(Item.dtype, np.integer):
+        raise ValueError(f"bin width and item sizes must be integers, got {type(width).__name__} and {Item.dtype}")
+    w = Item.min(axis=1) if allow_rotation else Item[:, 0]
+    if len(Item) and float(w.mean()) ** 2 > PLACED_INDEX_RATIO * width:
+        return PlacedIndex()
+    return Contour(int(width))
+
+# 轮廓索引：按列记录箱子中已被占用的竖直区间，随物品装入增量更新
+# 思路：箱子宽度为整数，每一列保存升序的区间边界[b0,t0,b1,t1,...]，首尾相接的区间合并为一段；
+#      sky保存每一列的最高点（天际线）。下降和左移只需要查看物品附近的列，不再遍历所有已装入的物品
+# 要求物品宽度、高度和箱子宽度都是整数
+class Contour:
+    def __init__(self, width):
+        self.width = width
+        self.skyExt = np.zeros(width + 1, dtype=np.int64)  # 末尾多一个哨兵，批量查询时np.maximum.reduceat的下标可以取到width
+        self.sky = self.skyExt[:width]  # 每一列的天际线高度
+        self.cols = [[] for _ in range(width)]  # 每一列已占用区间的边界
+        self.colIdx = np.arange(width)  # 列号，批量查询时用来找各物品左侧的列
+
+    # 清空轮廓，保留已分配的数组和列表
+    def reset(self):
+        self.sky[:] = 0
+        for bd in self.cols:
+            bd.clear()
+
+    # 将物品item（右上角顶点坐标itemRP）加入轮廓
+    def add(self, item, itemRP):
+        x2, y2 = int(itemRP[0]), int(itemRP[1])
+        x1, y1 = x2 - int(item[0]), y2 - int(item[1])
+        for c in range(x1, x2):
+            bd = self.cols[c]
+            p = bisect_right(bd, y1)  # 新区间位于两段已占用区间之间的空隙中
+            mergeL = p > 0 and bd[p - 1] == y1  # 与下方区间首尾相接
+            mergeR = p < len(bd) and bd[p] == y2  # 与上方区间首尾相接
+            if mergeL and mergeR:
+                del bd[p - 1:p + 1]
+            elif mergeL:
+                bd[p - 1] = y2
+            elif mergeR:
+                bd[p] = y1
+            else:
+                bd[p:p] = [y1, y2]
+            self.sky[c] = bd[-1]
+
+    # 封闭空洞：物品只会向下或向左移动，从右侧和上方都无法到达的空闲区间以后不会再被使用，把它们并入已占用区间
+    # 思路：从最右一列向左扫描，第c列的一段空闲区间只能从第c+1列的可到达区间向左进入，进入后可以继续下降到该段底部；
+    #      最右一列只有天际线以上可以到达。封闭后的查询结果不变，每一列只保留天际线和仍可到达的空洞
+    def seal(self):
+        reach = []  # 右侧一列中可以到达的空闲区间[(下端，上端)]，升序
+        for c in range(self.width - 1, -1, -1):
+            bd = self.cols[c]
+            sky = bd[-1] if bd else 0
+            parts = []  # 本列可以到达的空闲区间
+            j = 0
+            t = 0
+            for k in range(0, len(bd), 2):  # 空闲区间[t, bd[k])位于第k/2段已占用区间下方
+                b = bd[k]
+                if b > t:
+                    while j < len(reach) and reach[j][1] <= t:
+                        j += 1
+                    r = t  # 本段从右侧进入后能到达的最高位置
+                    m = j
+                    while m < len(reach) and reach[m][0] < b:
+                        r = max(r, min(b, reach[m][1]))
+                        m += 1
+                    if r > t:
+                        parts.append((t, r))
+                t = bd[k + 1]
+            # 重新生成本列的区间边界：天际线以下除可到达的空闲区间外都视为已占用
+            newbd = []
+            cur = 0
+            for t, r in parts:
+                if t > cur:
+                    newbd += [cur, t]
+                cur = r
+            if sky > cur:
+                newbd += [cur, sky]
+            bd[:] = newbd
+            parts.append((sky, float('inf')))
+            reach = parts
+
+    # 与downHAtPoint作用一样：物品item在itemRP位置处可以下降的最大高度
+    def downHAtPoint(self, item, itemRP):
+        x2, y2 = int(itemRP[0]), int(itemRP[1])
+        x1, yb = x2 - int(item[0]), y2 - int(item[1])
+        top = int(self.sky[x1:x2].max())
+        if top <= yb:  # 物品下方的所有列都低于物品底边，直接落到天际线上
+            return yb - top
+        return yb - self._topBelow(x1, x2, yb)
+
+    # 第x1到x2-1列中不超过yb的最高已占用区间上端
+    def _topBelow(self, x1, x2, yb):
+        top = 0
+        for c in range(x1, x2):
+            bd = self.cols[c]
+            p = bisect_right(bd, yb)
+            p -= p & 1  # 不超过yb的最高区间上端
+            if p > 0 and bd[p - 1] > top:
+                top = bd[p - 1]
+        return top
+
+    # 与leftWAtPoint作用一样：物品item在itemRP位置处可以向左移动的最大距离
+    def leftWAtPoint(self, item, itemRP):
+        x2, y2 = int(itemRP[0]), int(itemRP[1])
+        x1, y1 = x2 - int(item[0]), y2 - int(item[1])
+        # 天际线不高于物品底边的列不可能挡住物品，只需从右向左检查其余的列
+        return self._leftScan(np.nonzero(self.sky[:x1] > y1)[0], x1, y1, y2)
+
+    # 从右向左检查候选列cols（升序），返回物品(x1, y1, y2)可以向左移动的最大距离
+    def _leftScan(self, cols, x1, y1, y2):
+        for c in cols[::-1]:
+            if self._blocks(c, y1, y2):
+                return x1 - int(c) - 1
+        return x1
+
+    # 第c列是否存在与(y1,y2)相交的已占用区间
+    def _blocks(self, c, y1, y2):
+        bd = self.cols[c]
+        p = bisect_right(bd, y1)
+        return (p & 1) or (p < len(bd) and bd[p] < y2)
+
+    # downHAtPoint的批量版本：一次计算多个物品（例如同一物品的两个方向）各自可以下降的最大高度
+    # 输入w、h、X、Y：  各物品的宽度、高度和右上角坐标，整数列表
+    # 输出：  各物品可以下降的最大高度，整数列表
+    # 各物品覆盖的列[X-w, X)的天际线最高点用一次np.maximum.reduceat求出；只有天际线高于物品底边的才逐列查找
+    def downHBatch(self, w, h, X, Y):
+        bounds = []
+        for a, x in zip(w, X):
+            bounds += (x - a, x)
+        top = np.maximum.reduceat(self.skyExt, bounds)[::2].tolist()
+        down = []
+        for a, b, x, y, t in zip(w, h, X, Y, top):
+            yb = y - b
+            if t > yb:
+                t = self._topBelow(x - a, x, yb)
+            down.append(yb - t)
+        return down
+
+    # leftWAtPoint的批量版本，参数与downHBatch相同
+    # 一次求出各物品左侧天际线高于物品底边的最右一列，大多数情况下这一列就挡住了物品，否则再向左逐列检查
+    def leftWBatch(self, w, h, X, Y):
+        x1 = [x - a for a, x in zip(w, X)]
+        y1 = [y - b for b, y in zip(h, Y)]
+        block = (self.sky > np.array(y1)[:, None]) & (self.colIdx < np.array(x1)[:, None])  # 可能挡住各物品的列
+        last = np.where(block, self.colIdx, -1).max(axis=1).tolist()
+        left = []
+        for k, c in enumerate(last):
+            if c < 0:  # 左侧没有可能挡住物品的列，直接移到箱子最左端
+                left.append(x1[k])
+            elif self._blocks(c, y1[k], Y[k]):
+                left.append(x1[k] - c - 1)
+            else:
+                left.append(self._leftScan(np.flatnonzero(block[k, :c]), x1[k], y1[k], Y[k]))
+        return left
+
+    # 与overlap作用一样：物品item在itemRP位置处与已装入物品是否有重合
+    def overlap(self, item, itemRP):
+        x2, y2 = int(itemRP[0]), int(itemRP[1])
+        x1, y1 = x2 - int(item[0]), y2 - int(item[1])
+        if x1 >= x2 or self.sky[x1:x2].max() <= y1:
+            return 0
+        for c in range(x1, x2):
+            bd = self.cols[c]
+            p = bisect_right(bd, y1)
+            if (p & 1) or (p < len(bd) and bd[p] < y2):
+                return 1
+        return 0
+
+# 天际线：只记录每一段的最高点，物品只能放在天际线上方，不会进入物品下方的空洞
+# xs、ys为各段左端x坐标和高度，第i段覆盖[xs[i], xs[i+1])，相邻两段高度不同
+class Skyline:
+    def __init__(self, width):
+        self.width = width
+        self.xs = [0]
+        self.ys = [0]
+
+    # 最低（高度相同时最左）可以放下宽度w的位置(x, y)，x为左端，y为底边；放不下时返回None
+    def find(self, w):
+        xs, ys = self.xs, self.ys
+        n = len(xs)
+        best = None
+        for i in range(n):
+            x = xs[i]
+            if x + w > self.width:
+                break
+            y = ys[i]
+            j = i + 1
+            while j < n and xs[j] < x + w:
+                if ys[j] > y:
+                    y = ys[j]
+                j += 1
+            if best is None or y < best[1]:
+                best = (x, y)
+        return best
+
+    # 最低（高度相同时最左）的一段
+    # 输出：  (段编号i，左端x，宽度，高度)；相邻两段高度不同，所以这一段两侧都更高（或是箱子边界）
+    def lowest(self):
+        ys = self.ys
+        i = ys.index(min(ys))
+        xe = self.xs[i + 1] if i + 1 < len(self.xs) else self.width
+        return i, self.xs[i], xe - self.xs[i], ys[i]
+
+    # 将[x, x+w)的高度设为top
+    def add(self, x, w, top):
+        xs, ys = self.xs, self.ys
+        xe = x + w
+        i = bisect_left(xs, x)  # 第一段左端不小于x的段
+        j = bisect_left(xs, xe)  # 第一段左端不小于xe的段
+        if xe < self.width and (j == len(xs) or xs[j] != xe):
+            xs[i:j] = [x, xe]  # xe处保留原来覆盖xe那一段的高度
+            ys[i:j] = [top, ys[j - 1]]
+        else:
+            xs[i:j] = [x]
+            ys[i:j] = [top]
+        # 与左右相邻且高度相同的段合并
+        if i > 0 and ys[i - 1] == ys[i]:
+            del xs[i], ys[i]
+            i -= 1
+        if i + 1 < len(xs) and ys[i + 1] == ys[i]:
+            del xs[i + 1], ys[i + 1]
+
 # 计算物品从当前位置向下向左移动后到最终位置后右上角顶点坐标
 # 输入item：   物品[宽度，高度]
 # 输入Item：   各个物品[宽度，高度]
 # 输入itemRP： 此时物品右上角顶点坐标[x,y]
-# 输入RPNXY：  当前箱子中所有物品右上角顶点坐标数组
+# 输入RPNXY：  当前箱子中所有物品右上角顶点坐标数组（[物品编号，X，Y]列表或装箱状态PackState）
+# 输入contour：可选的轮廓索引Contour或放置索引PlacedIndex，给出时用它代替对RPNXY的遍历
 # 输出finalRP：物品item在箱子内任意位置向下向左移动后到最终位置后右上角顶点坐标
-def finalPos(item,Item,itemRP,RPNXY):
+def finalPos(item,Item,itemRP,RPNXY,contour=None):
+    if contour is None and len(RPNXY)>0 and not isinstance(RPNXY,PackState):
+        RPNXY=np.asarray(RPNXY)  #只转换一次数组，循环中的批量计算共用
     # 当物品item不能再继续下降或不能继续左移的时候，跳出循环
     while 1:
-        downH=downHAtPoint(item,Item,itemRP,RPNXY) #计算物品item在箱子内itemRP位置处可以下降的最大高度
+        downH=downHAtPoint(item,Item,itemRP,RPNXY,contour) #计算物品item在箱子内itemRP位置处可以下降的最大高度
         leftW=0
         itemRP=Update_itemRP(itemRP,downH,leftW) #更新物品item当前位置右上角顶点坐标
         downH=0
-        leftW=leftWAtPoint(item,Item,itemRP,RPNXY) #计算物品item在箱子内itemRP位置处可以向左移动的最大距离
+        leftW=leftWAtPoint(item,Item,itemRP,RPNXY,contour) #计算物品item在箱子内itemRP位置处可以向左移动的最大距离
         itemRP=Update_itemRP(itemRP,downH,leftW) #更新物品item当前位置右上角顶点坐标
         if (downH==0)and (leftW==0):
             finalRP=itemRP
             break
     return finalRP
 
+# finalPos的批量版本：多个物品（例如同一物品的两个方向）同时向下向左移动，每一步对所有还在移动的物品做一次批量查询
+# 输入items：   各物品[宽度，高度]，形状为(K, 2)
+# 输入Item：    各个物品[宽度，高度]
+# 输入itemRPs： 各物品的初始右上角顶点坐标，形状为(K, 2)
+# 输入RPNXY：   当前箱子中所有物品右上角顶点坐标数组（[物品编号，X，Y]列表或装箱状态PackState）
+# 输入contour： 轮廓索引Contour；其他索引或不使用索引时逐个调用finalPos
+# 输出：  各物品最终位置的右上角顶点坐标[x,y]组成的列表；每个物品的结果与单独调用finalPos相同
+def finalPosBatch(items,Item,itemRPs,RPNXY,contour=None):
+    if not isinstance(contour,Contour):
+        return [finalPos(item,Item,itemRP,RPNXY,contour) for item,itemRP in zip(items,itemRPs)]
+    w=[int(item[0]) for item in items]
+    h=[int(item[1]) for item in items]
+    X=[int(itemRP[0]) for itemRP in itemRPs]
+    Y=[int(itemRP[1]) for itemRP in itemRPs]
+    active=list(range(len(items)))  # 还在移动的物品
+    finalRPs=[None]*len(items)
+    while active:
+        for k,d in enumerate(contour.downHBatch(w,h,X,Y)):
+            Y[k]-=d
+        leftW=contour.leftWBatch(w,h,X,Y)
+        for k,d in enumerate(leftW):
+            X[k]-=d
+        if 0 in leftW:  # 与finalPos相同：下降后不能再左移时停止
+            for k,d in enumerate(leftW):
+                if d==0:
+                    finalRPs[active[k]]=[X[k],Y[k]]
+            keep=[k for k,d in enumerate(leftW) if d]
+            active,w,h,X,Y=([v[k] for k in keep] for v in (active,w,h,X,Y))
+    return finalRPs
+
 # 判断物品item在当前位置itemRP与箱子中其他物品是否有重合
 # 输入item：   物品[宽度，高度]
 # 输入Item：   各个物品[宽度，高度]
 # 输入itemRP： 此时物品右上角顶点坐标[x,y]
-# 输入RPNXY：  当前箱子中所有物品右上角顶点坐标数组
+# 输入RPNXY：  当前箱子中所有物品右上角顶点坐标数组（[物品编号，X，Y]列表或装箱状态PackState）
+# 输入contour：可选的轮廓索引Contour或放置索引PlacedIndex
 # 输出flagOL： 如果重合flagOL=1；反之flagOL=0
-def overlap(item,Item,itemRP,RPNXY):
+def overlap(item,Item,itemRP,RPNXY,contour=None):
+    if contour is not None:
+        return contour.overlap(item,itemRP)
     flagOL=0  # 初始化不存在重合情况
     itemLBP=[itemRP[0]-item[0],itemRP[1]-item[1]] #左下角顶点坐标
     A = Rectangle(itemLBP[0],itemLBP[1],item[0],item[1])
     num=len(RPNXY) # 箱子中物品数目
     if num>0:
-        for i in range(num):
-            width=Item[RPNXY[i][0],0]  #Item(RPNXY(i,1),:)宽度
-            height=Item[RPNXY[i][0],1]  #Item(RPNXY(i,1),:)高度
-            LBPXY=[RPNXY[i][1]-width,RPNXY[i][2]-height]  #在箱子中的当前矩形Item(RPNXY(i,1),:)的左下角顶点坐标
-            B = Rectangle(LBPXY[0],LBPXY[1],width,height)
-            area=rectint(A,B)#计算物品A与B相交的面积
-            #如果AB相交，则满足下列关系
-            if area>0:
-                flagOL=1
-                break
+        if isinstance(RPNXY,PackState):
+            _,x1,y1,x2,y2,_=RPNXY.view()
+            B=(x1,y1,x2-x1,y2-y1)
+        else:
+            sRPNXY=np.asarray(RPNXY)
+            size=Item[sRPNXY[:,0]]  #箱子中各物品的[宽度，高度]
+            B=np.column_stack((sRPNXY[:,1]-size[:,0],sRPNXY[:,2]-size[:,1],size[:,0],size[:,1]))  #各物品[左下角x，左下角y，宽度，高度]
+        area=rectint_batch(A,B)  #一次性计算物品A与所有物品相交的面积
+        #只要与其中一个物品相交，就存在重合
+        if (area>0).any():
+            flagOL=1
     return flagOL
 # 计算两个矩形相交的面积，和MATLAB中rectint函数作用一样
 def rectint(rect1, rect2):
@@ -220,4 +631,18 @@ def rectint(rect1, rect2):
     if width <= 0 or height <= 0:
         return 0
     cross_square = width * height
-    return cross_square
\ No newline at end of file
+    return cross_square
+
+# rectint的批量版本：计算矩形rect1与rects中每个矩形相交的面积
+# 输入rect1：  矩形Rectangle
+# 输入rects：  多个矩形组成的数组，每行[左下角x，左下角y，宽度，高度]；也可以是四列组成的元组
+# 输出：  每个矩形对应的相交面积数组，不相交为0
+def rectint_batch(rect1, rects):
+    x, y, w, h = rects if isinstance(rects, tuple) else np.asarray(rects).T
+    xmin = np.maximum(rect1.x, x)
+    ymin = np.maximum(rect1.y, y)
+    xmax = np.minimum(rect1.x + rect1.width, x + w)
+    ymax = np.minimum(rect1.y + rect1.height, y + h)
+    width = xmax - xmin
+    height = ymax - ymin
+    return np.where((width > 0) & (height > 0), width * height, 0)
\ No newline at end of file
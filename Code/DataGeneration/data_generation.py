@@ -0,0 +1,103 @@
+import argparse
+import os
+import numpy as np
+
+
+# 与DataGeneration.c相同的三种分布，但使用带种子的NumPy随机数生成器，一次生成一块物品：
+#   1 —— 正态分布，均值为(最小值+最大值)/2，标准差为(最大值-最小值)/6，截断为整数
+#   2 —— 偏小：在[最小值，最大值/2]中均匀取整数
+#   3 —— 偏大：在[最大值/2，最大值]中均匀取整数
+# 结果都限制在[最小值，最大值]之间。同样的种子、尺寸和分布总是生成同样的算例，与分块大小无关
+SIZES = [10, 50, 100, 500, 1000, 3000, 5000, 8000, 10000]
+CHUNK = 1 << 20  # 每块生成的物品数量
+
+
+# 每个算例的随机数生成器，由种子、分布和尺寸共同决定，各算例互不影响
+def case_rng(seed, dist, size):
+    return np.random.default_rng([seed, dist, size])
+
+
+# 生成count个物品的[宽度，高度]
+# 输出：  int32数组，形状为(count, 2)
+def generate_chunk(rng, count, dist, width_min, width_max, height_min, height_max):
+    lo = np.array([width_min, height_min])
+    hi = np.array([width_max, height_max])
+    if dist == 1:
+        mean = (lo + hi) // 2
+        stddev = (hi - lo) // 6
+        items = np.trunc(mean + rng.standard_normal((count, 2)) * stddev)
+    elif dist == 2:
+        items = rng.integers(lo, hi // 2, size=(count, 2), endpoint=True)
+    elif dist == 3:
+        items = rng.integers(hi // 2, hi, size=(count, 2), endpoint=True)
+    else:
+        raise ValueError(f"unknown distribution: {dist}")
+    return np.clip(items, lo, hi).astype(np.int32)
+
+
+# 逐块生成size个物品
+def generate_items(seed, dist, size, width=100, max_height=50, chunk=CHUNK):
+    rng = case_rng(seed, dist, size)
+    for start in range(0, size, chunk):
+        yield generate_chunk(rng, min(chunk, size - start), dist, 1, width, 1, max_height)
+
+
+# 逐块写出文本格式的算例，与Test_cases中的文件格式相同
+def write_text(filename, width, size, chunks):
+    with open(filename, 'w') as file:
+        file.write(f"Given width: {width}\n")
+        file.write(f"Number of rectangles: {size}\n")
+        file.write("Width\tHeight\n")
+        for items in chunks:
+            file.write(('%d\t%d\n' * len(items)) % tuple(items.ravel().tolist()))  # 整块一次格式化，比逐行np.savetxt快得多
+
+
+# 逐块写出二进制格式的算例：.npy文件，第0行为[箱子宽度，矩形数量]，之后每行为一个物品，
+# 与instance_io的缓存文件格式相同，可以直接用read_input_from_file内存映射读取
+def write_binary(filename, width, size, chunks):
+    data = np.lib.format.open_memmap(filename, mode='w+', dtype=np.int32, shape=(size + 1, 2))
+    data[0] = (width, size)
+    row = 1
+    for items in chunks:
+        data[row:row + len(items)] = items
+        row += len(items)
+    data.flush()
+    del data
+
+
+# 生成一个算例，fmt为'text'、'binary'或'both'，返回写出的文件路径
+def generate_case(out_dir, seed, dist, size, width=100, max_height=50, fmt='text', chunk=CHUNK):
+    paths = []
+    base = os.path.join(out_dir, f"test_size_{size}_dist_{dist}")
+    if fmt in ('text', 'both'):
+        paths.append(base + '.txt')
+        write_text(paths[-1], width, size, generate_items(seed, dist, size, width, max_height, chunk))
+    if fmt in ('binary', 'both'):
+        paths.append(base + '.npy')
+        write_binary(paths[-1], width, size, generate_items(seed, dist, size, width, max_height, chunk))
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description='生成装箱算例，三种分布与DataGeneration.c相同，结果由种子决定')
+    parser.add_argument('--sizes', type=int, nargs='+', default=SIZES, help='各算例的矩形数量')
+    parser.add_argument('--dists', type=int, nargs='+', default=[1, 2, 3], help='分布：1正态，2偏小，3偏大')
+    parser.add_argument('--width', type=int, default=100, help='箱子宽度，也是物品宽度的最大值')
+    parser.add_argument('--max-height', type=int, default=50, help='物品高度的最大值')
+    parser.add_argument('--seed', type=int, default=0, help='随机种子')
+    parser.add_argument('--format', default='text', choices=['text', 'binary', 'both'], help='输出格式')
+    parser.add_argument('--chunk', type=int, default=CHUNK, help='每块生成的物品数量')
+    parser.add_argument('--out-dir', default='Test_cases', help='输出目录')
+    args = parser.parse_args()
+
+    os.makedirs(args.out_dir, exist_ok=True)
+    for size in args.sizes:
+        for dist in args.dists:
+            for path in generate_case(args.out_dir, args.seed, dist, size, args.width, args.max_height,
+                                      args.format, args.chunk):
+                print(f"Test case written to {path}")
+    print("All test cases generated successfully.")
+
+
+if __name__ == '__main__':
+    main()
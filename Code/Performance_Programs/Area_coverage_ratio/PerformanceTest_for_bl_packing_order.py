@@ -1,175 +1,105 @@
+import os
 import numpy as np
-import pandas as pd
-import random
-import matplotlib.pyplot as plt
-import matplotlib.patches as patches
+from multiprocessing import Pool, shared_memory
 from tools import *
-
-
-# 从文件中读取输入数据
-def read_input_from_file(filename):
-    with open(filename, 'r') as file:
-        lines = file.readlines()
-
-        # 提取给定宽度和矩形数量
-        given_width = int(lines[0].split(':')[1].strip())
-        number_of_rectangles = int(lines[1].split(':')[1].strip())
-
-        # 提取矩形的宽度和高度
-        items = []
-        for line in lines[3:]:  # 从第四行开始跳过表头
-            width, height = map(int, line.strip().split())
-            items.append([width, height])
-
-        return given_width, number_of_rectangles, np.array(items)
-
-
-# 从文件读取输入
-filename = 'test_size_10_dist_1.txt'
-WIDTH, itemNum, AllItem = read_input_from_file(filename)
-
-# 将物品数据转换为DataFrame格式
-df_AllItem = pd.DataFrame(AllItem, columns=['width', 'length'])
-print(df_AllItem)
-
-# 箱子的长度为所有物品中最大长度与物品数量的乘积
-LENGTH = max(AllItem[:, 1]) * itemNum  
-Bin = [WIDTH, LENGTH]  # 箱子的宽度与长度
-print(f"Initial bin length is: {LENGTH}")  # 打印初始箱子长度
-
-ansBXY = np.zeros((itemNum, 3))  # [箱子编号，X坐标，Y坐标]
-RPNXY = []  # 存储已装入物品的坐标
-BinNum = 1
-flagItem = np.zeros(itemNum)  # 标记物品是否已装入箱子，0表示未装入，1表示已装入
-max_length = 0  # 记录箱子的最大长度
-
-# 为每个物品生成一个随机颜色
-item_colors = {i: np.random.rand(3, ) for i in range(itemNum)}  # 为每个物品分配一个随机颜色
-
-
-# 开始装箱过程
-def try_pack(bin_length):
-    global RPNXY, flagItem, ansBXY, Bin, max_length
-    max_length = 0  # 箱子最大长度初始化
-    Bin = [WIDTH, bin_length]  # 更新箱子的宽度与长度
-    RPNXY = []  # 清空已装入物品的记录
-    flagItem = np.zeros(itemNum)  # 重置物品装入标记
-
-    for i in range(itemNum):
-        if flagItem[ran[i]] == 0:  # 如果该物品未被装入箱子
-            item = AllItem[ran[i], :]
-            itemRP = Bin  # 初始位置在箱子的右上角
-            flagOL = overlap(item, AllItem, itemRP, RPNXY)  # 检查物品是否重叠
-            if flagOL == 0:
-                itemRP = finalPos(item, AllItem, itemRP, RPNXY)  # 找到物品的最终位置
-                if len(itemRP) > 0:
-                    RPNXY.append([ran[i], itemRP[0], itemRP[1]])  # 保存物品的坐标
-                    flagItem[ran[i]] = 1  # 标记该物品已装入箱子
-                    if itemRP[1] > max_length:  # 更新箱子的最大长度
-                        max_length = itemRP[1]
-    return all(flagItem)  # 如果所有物品都被装入，返回True，否则返回False
-
-
-# 计算装箱覆盖率（即物品所占面积与箱子面积的比率）
-def compute_coverage_ratio(packed_items, bin_width, bin_length):
-    # 将物品的位置与尺寸合并
-    packed_items = pd.DataFrame(packed_items, columns=['itemNum', 'X', 'Y'])
-    packed_items = packed_items.merge(df_AllItem, left_on='itemNum', right_index=True)
-
-    # 计算所有已装入物品的总面积
-    packed_items['area'] = packed_items['width'] * packed_items['length']
-    total_area = packed_items['area'].sum()
-
-    # 计算箱子的总面积
-    bin_area = bin_width * bin_length
-
-    # 计算覆盖率
-    coverage_ratio = total_area / bin_area
-    return coverage_ratio
-
-
-# 可视化已装入物品的图形展示
-def visualize_packing(packed_items, bin_width, bin_length, all_items, coverage_ratio_result):
-    """
-    可视化已装入物品在容器中的位置，并显示正确的Y轴方向。
-
-    参数:
-    - packed_items: 物品的列表，每个物品包含[itemNum, X, Y]。
-    - bin_width: 容器的宽度。
-    - bin_length: 容器的长度。
-    - all_items: 所有物品的DataFrame，包含物品的尺寸信息。
-    """
-    # 创建绘图
-    fig, ax = plt.subplots(figsize=(10, 10))
-
-    # 绘制容器的外框
-    ax.set_xlim(0, bin_width)
-    ax.set_ylim(0, bin_length)
-    ax.set_aspect('equal', adjustable='box')
-    ax.set_title(f'coverage ratio: {coverage_ratio_result:.4f}')
-    ax.set_xlabel('X 坐标')
-    ax.set_ylabel('Y 坐标')
-
-    # 添加网格以便更好地观察
-    ax.grid(True, which='both', linestyle='--', linewidth=0.5)
-
-    # 绘制每个已装入的物品
-    for packed_item in packed_items:
-        itemNum, X, Y = packed_item
-        width, length = all_items.loc[itemNum, ['width', 'length']]
-
-        # 矩形的左下角坐标
-        bottom_left_x = X - width
-        bottom_left_y = Y - length
-
-        # 创建矩形
-        rect = patches.Rectangle(
-            (bottom_left_x, bottom_left_y),  # 左下角坐标
-            width,
-            length,
-            linewidth=1,
-            edgecolor='black',
-            facecolor=np.random.rand(3, ),  # 每个物品的随机颜色
-            alpha=0.7
-        )
-        ax.add_patch(rect)
-
-        # 在矩形上添加物品编号和坐标文本
-        ax.text(X - width / 2, Y - length / 2, f'{itemNum}', color='white', ha='center', va='center', fontsize=10)
-        ax.text(X, Y, f'({X}, {Y})', color='blue', fontsize=8, ha='left', va='bottom')
-
-    # 设置显示范围并展示图像
-    ax.set_xlim(0, bin_width)
-    ax.set_ylim(0, bin_length)
-    plt.show()
-
-
-# 初始覆盖率
-max_coverage_ratio = 0
-min_coverage_ratio = 1
-
-# 尝试装箱多次并寻找最佳和最差的装箱方案
-for i in range(1, 10001):
-    ran = list(range(itemNum))  # 生成物品的随机序列
-    random.shuffle(ran)  # 随机打乱装箱顺序
-    if try_pack(LENGTH):
-        coverage_ratio = compute_coverage_ratio(RPNXY, WIDTH, max_length)
-        print(f"{i}th time coverage_ratio: {coverage_ratio}")
-        if coverage_ratio > max_coverage_ratio:
-            max_coverage_ratio = coverage_ratio
-            length_for_max_coverage_ratio = max_length
-            RPNXY_for_max_coverage_ratio = RPNXY
-            max_ran = ran
-        if coverage_ratio < min_coverage_ratio:
-            min_coverage_ratio = coverage_ratio
-            length_for_min_coverage_ratio = max_length
-            RPNXY_for_min_coverage_ratio = RPNXY
-            min_ran = ran
-
-# 输出最大和最小覆盖率的信息
-print(f"All items packed!\t Max Coverage Ratio: {max_coverage_ratio:.4f}\t  Min Coverage Ratio: {min_coverage_ratio:.4f}")  # 覆盖率
-# 输出最大和最小覆盖率时的物品顺序
-print(f"Max Coverage Ratio Ran: {max_ran}\t Min Coverage Ratio Ran: {min_ran}")
-# 可视化最大和最小覆盖率的装箱情况
-visualize_packing(RPNXY_for_max_coverage_ratio, WIDTH, length_for_max_coverage_ratio, df_AllItem, max_coverage_ratio)
-visualize_packing(RPNXY_for_min_coverage_ratio, WIDTH, length_for_min_coverage_ratio, df_AllItem, min_coverage_ratio)
+from bl_packer import BottomLeftPacker
+from instance_io import read_input_from_file
+from render import render_layout
+from result_cache import ResultCache, cached_try_pack
+from orderings import pack_portfolio
+
+
+NUM_RESTARTS = 10000  # 随机装箱顺序的尝试次数
+CHUNK_SIZE = 100  # 每个任务包含的随机种子数
+CACHE_DIR = None  # 装箱结果缓存目录（例如'pack_cache'），同一个算例和种子再次运行时直接读取结果；默认不使用缓存，
+# 每个种子写一个文件，NUM_RESTARTS次尝试会写出同样多的文件
+
+
+# 由随机种子生成装箱顺序，父进程和子进程用同一个种子得到同一个顺序
+def seeded_order(seed, itemNum):
+    return np.random.default_rng(seed).permutation(itemNum)
+
+
+# 子进程初始化：从共享内存中取出物品数据，每个子进程只创建一次装箱引擎和结果缓存
+def init_worker(shm_name, shape, dtype, width, cache_dir):
+    global worker_shm, worker_packer, worker_cache
+    worker_shm = shared_memory.SharedMemory(name=shm_name)  # 保持引用，避免共享内存被提前释放
+    items = np.ndarray(shape, dtype=dtype, buffer=worker_shm.buf)
+    worker_packer = BottomLeftPacker(width, items)
+    worker_cache = ResultCache(cache_dir) if cache_dir else None
+
+
+# 子进程任务：依次用一组种子的顺序装箱（先查缓存），返回[(种子，箱子长度，覆盖率)]和本组的缓存命中、未命中次数
+def pack_seeds(seeds):
+    packer, cache = worker_packer, worker_cache
+    hits, misses = (cache.hits, cache.misses) if cache else (0, 0)
+    results = []
+    for seed in seeds:
+        packed, length, coverage, _ = cached_try_pack(cache, packer, seeded_order(seed, packer.itemNum))
+        if packed:
+            results.append((seed, length, coverage))
+    if cache:
+        return results, cache.hits - hits, cache.misses - misses
+    return results, 0, 0
+
+
+if __name__ == '__main__':
+    # 从文件读取输入
+    filename = 'test_size_10_dist_1.txt'
+    WIDTH, itemNum, AllItem = read_input_from_file(filename)
+
+    print(f"WIDTH = {WIDTH}\t Number of items: {itemNum}")
+
+    # 装箱引擎只创建一次，用于重建最好和最差的装箱方案；箱子的长度为所有物品中最大长度与物品数量的乘积
+    packer = BottomLeftPacker(WIDTH, AllItem)
+    cache = ResultCache(CACHE_DIR) if CACHE_DIR else None
+    LENGTH = packer.LENGTH
+    print(f"Initial bin length is: {LENGTH}")  # 打印初始箱子长度
+
+    # 把物品数据放入共享内存，子进程直接读取，不需要逐个任务传递
+    shm = shared_memory.SharedMemory(create=True, size=AllItem.nbytes)
+    try:
+        np.ndarray(AllItem.shape, dtype=AllItem.dtype, buffer=shm.buf)[:] = AllItem
+        chunks = [range(k, min(k + CHUNK_SIZE, NUM_RESTARTS)) for k in range(0, NUM_RESTARTS, CHUNK_SIZE)]
+
+        # 多进程并行尝试多个随机装箱顺序，只汇总每次尝试的(种子，箱子长度，覆盖率)
+        all_results = []
+        hits = misses = 0
+        with Pool(os.cpu_count(), initializer=init_worker,
+                  initargs=(shm.name, AllItem.shape, AllItem.dtype, WIDTH, CACHE_DIR)) as pool:
+            for results, h, m in pool.imap_unordered(pack_seeds, chunks):
+                all_results.extend(results)
+                hits += h
+                misses += m
+    finally:
+        shm.close()
+        shm.unlink()
+
+    # 覆盖率相同时取种子较小的一个，保证结果与任务完成的先后无关
+    max_result = max(all_results, key=lambda r: (r[2], -r[0]))
+    min_result = min(all_results, key=lambda r: (r[2], r[0]))
+
+    if CACHE_DIR:
+        print(f"Cache hits: {hits}\t misses: {misses}")
+
+    # 只重建最大和最小覆盖率时的装箱方案，使用缓存时两者都在缓存中
+    max_ran = seeded_order(max_result[0], itemNum)
+    _, length_for_max_coverage_ratio, max_coverage_ratio, records_for_max_coverage_ratio = \
+        cached_try_pack(cache, packer, max_ran, LENGTH)
+
+    min_ran = seeded_order(min_result[0], itemNum)
+    _, length_for_min_coverage_ratio, min_coverage_ratio, records_for_min_coverage_ratio = \
+        cached_try_pack(cache, packer, min_ran, LENGTH)
+
+    # 输出最大和最小覆盖率的信息
+    print(f"All items packed!\t Max Coverage Ratio: {max_coverage_ratio:.4f}\t  Min Coverage Ratio: {min_coverage_ratio:.4f}")  # 覆盖率
+    # 与几个按尺寸从大到小的确定性顺序比较，它们只需要几次装箱
+    _, best = pack_portfolio(packer, cache=cache)
+    if best is not None:
+        print(f"Best sorted ordering: {best[0]}\t Coverage Ratio: {best[2]:.4f}")
+    # 输出最大和最小覆盖率时的随机种子和物品顺序
+    print(f"Max Coverage Ratio Seed: {max_result[0]}\t Min Coverage Ratio Seed: {min_result[0]}")
+    print(f"Max Coverage Ratio Ran: {max_ran.tolist()}\t Min Coverage Ratio Ran: {min_ran.tolist()}")
+    # 可视化最大和最小覆盖率的装箱情况
+    render_layout(records_for_max_coverage_ratio, WIDTH, length_for_max_coverage_ratio, max_coverage_ratio, show=True)
+    render_layout(records_for_min_coverage_ratio, WIDTH, length_for_min_coverage_ratio, min_coverage_ratio, show=True)
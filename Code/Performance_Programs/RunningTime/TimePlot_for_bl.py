@@ -1,54 +1,18 @@
-import time
 import os
-import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
 from numpy.polynomial.polynomial import Polynomial
 from tools import *  
-
-
-# 从文件读取输入数据
-def read_input_from_file(filename):
-    with open(filename, 'r') as file:
-        lines = file.readlines()
-        # 提取给定的宽度和矩形的数量
-        given_width = int(lines[0].split(':')[1].strip())
-        number_of_rectangles = int(lines[1].split(':')[1].strip())
-        items = []
-        # 从文件的每一行提取矩形的宽度和高度
-        for line in lines[3:]:
-            width, height = map(int, line.strip().split())
-            items.append([width, height])
-        # 返回给定宽度、矩形数量和矩形的数组
-        return given_width, number_of_rectangles, np.array(items)
+from bl_packer import BottomLeftPacker
+from instance_io import read_input_from_file
+from bench_suite import sample, summarize
 
 
 # 执行打包模拟的函数
 def try_pack(bin_length, itemNum, AllItem):
-    max_length = 0  # 用来记录放入所有矩形后的最大长度
-    Bin = [WIDTH, bin_length]  # 设置一个二维的箱子，宽度是 WIDTH，长度是 bin_length
-    RPNXY = []  # 用于存储已放置矩形的位置
-    flagItem = np.zeros(itemNum)  # 用一个数组记录哪些矩形已经被放置
-
-    # 遍历每个矩形，尝试将其放入箱子
-    for i in range(itemNum):
-        if flagItem[i] == 0:  # 只考虑未放置的矩形
-            item = AllItem[i, :]  # 当前矩形的尺寸
-            itemRP = Bin  # 当前的箱子尺寸
-            # 检查矩形是否与已经放置的矩形重叠
-            flagOL = overlap(item, AllItem, itemRP, RPNXY)  # 假设 overlap 函数在其他地方定义
-            if flagOL == 0:  # 如果没有重叠，就可以放置该矩形
-                # 计算矩形的最终位置
-                itemRP = finalPos(item, AllItem, itemRP, RPNXY)  # 假设 finalPos 函数在其他地方定义
-                if len(itemRP) > 0:
-                    # 将矩形的索引和位置添加到 RPNXY 中
-                    RPNXY.append([i, itemRP[0], itemRP[1]])
-                    flagItem[i] = 1  # 标记该矩形已被放置
-                    # 更新最大长度
-                    if itemRP[1] > max_length:
-                        max_length = itemRP[1]
+    packer = BottomLeftPacker(WIDTH, AllItem)  # 装箱引擎，按文件中的顺序装箱
+    packed = packer.try_pack(None, bin_length)
     # 返回是否所有矩形都被放置、最大长度和矩形的最终位置
-    return all(flagItem), max_length, RPNXY
+    return packed, packer.max_length, packer.records()
 
 
 # 包含测试用例的目录
@@ -81,19 +45,17 @@ for filename in file_list:
     if size not in size_to_times[distribution]:
         size_to_times[distribution][size] = []
 
-    # 运行打包模拟，并记录运行时间
-    start_time = time.time()  # 记录开始时间
-    _, max_length, _ = try_pack(max(AllItem[:, 1]) * itemNum, itemNum, AllItem)  # 调用 try_pack 函数进行打包
-    end_time = time.time()  # 记录结束时间
-
-    # 计算运行时间
-    execution_time = end_time - start_time
+    # 运行打包模拟，预热一次后采样三次，取中位数作为运行时间
+    times = sample(lambda: try_pack(max(AllItem[:, 1]) * itemNum, itemNum, AllItem), 1, 1, 3)
+    execution_time, _ = summarize(times)
     print(f"正在处理文件: {filename}\t 尺寸: {size}\t 分布: {distribution}\t 执行时间: {execution_time} 秒")
 
     # 将运行时间追加到对应分布和尺寸的字典中
     size_to_times[distribution][size].append(execution_time)
 
-# 将结果写入 CSV 文件并为每个分布绘制图表
+# 将结果写入 CSV 文件并为每个分布绘制图表，pandas和matplotlib只在这里需要，计时结束后才导入
+import pandas as pd
+import matplotlib.pyplot as plt
 for dist in distributions:
     dist_input_sizes = []  # 存储该分布下的所有输入尺寸
     dist_average_times = []  # 存储该分布下的平均运行时间
@@ -0,0 +1,264 @@
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+import numpy as np
+import tools
+from tools import finalPos, overlap, Contour, PlacedIndex
+from bl_packer import BottomLeftPacker
+from instance_io import read_input_from_file
+import instrument
+
+
+# 装箱引擎的基准测试：
+#   try_pack —— 完整装箱一次
+#   finalPos —— 先按顺序装入一半物品，再对之后的物品逐个计算最终位置（不装入）
+#   overlap  —— 在同样的状态下，对这些物品的最终位置做重合判断
+# 每项先预热warmup次，再用perf_counter采样repeats次，报告中位数和四分位距；
+# 另外单独运行一次并用tracemalloc记录内存峰值，避免tracemalloc影响计时；
+# 指定--instrument时再单独运行一次并记录instrument模块的统计，同样不影响计时
+# finalPos和overlap的时间为单次调用的平均时间
+# --path选择索引：index为newIndex按物品尺寸选择的索引，contour、placed强制使用Contour或PlacedIndex，
+# scan不使用索引；--scale把箱子宽度和物品尺寸放大若干倍，用于比较宽箱子上两种索引的开销
+KERNELS = ('try_pack', 'finalPos', 'overlap')
+QUERIES = 200  # finalPos和overlap每次采样调用的次数上限
+HEAVY_MODULES = ('pandas', 'matplotlib')  # 装箱核心不应导入的模块
+
+# 启动时间测试：在新的解释器中导入装箱引擎并装入10个物品，输出导入和装箱的时间以及导入了哪些重量级模块
+STARTUP_SCRIPT = '''
+import json, sys, time
+start = time.perf_counter()
+sys.path.insert(0, {path!r})
+import numpy as np
+from bl_packer import BottomLeftPacker
+from instance_io import read_input_from_file
+packer = BottomLeftPacker(100, np.array([[66, 21], [23, 9], [38, 31], [6, 27], [46, 12],
+                                         [15, 40], [70, 5], [29, 18], [54, 33], [11, 8]], dtype=np.int32))
+packer.try_pack()
+print(json.dumps({{'in_process': time.perf_counter() - start,
+                  'heavy': sorted({{name.split('.')[0] for name in sys.modules}} & set({heavy!r}))}}))
+'''
+
+
+# 从文件名中提取输入尺寸和分布，例如test_size_100_dist_2.txt -> (100, 2)
+def parse_case_name(filename):
+    size = int(filename.split('size_')[1].split('_')[0])
+    dist = int(filename.split('dist_')[1].split('.txt')[0])
+    return size, dist
+
+
+# 以seed为种子的装箱顺序，同样的种子在任何机器上得到同样的顺序
+def seeded_order(seed, n):
+    return np.random.default_rng(seed).permutation(n)
+
+
+# 为一个测试文件和一个测试项准备好状态，返回一个不带参数的函数，每次调用执行一次被测操作
+# 输入path：  'index'使用装箱引擎选择的索引（默认），'contour'、'placed'强制使用Contour或PlacedIndex，
+#            'scan'不使用索引、每次遍历所有已装入的物品
+# 输出：  (被测函数，每次调用包含的操作数，使用的索引类名；scan时为None)
+def make_kernel(kernel, WIDTH, AllItem, order, path='index'):
+    packer = BottomLeftPacker(WIDTH, AllItem)
+    if path == 'contour':
+        packer.index = Contour(WIDTH)
+    elif path == 'placed':
+        packer.index = PlacedIndex()
+    indexName = None if path == 'scan' else type(packer.index).__name__
+    if kernel == 'try_pack':
+        if path == 'scan':
+            raise ValueError("try_pack always uses the packer's index")
+        return lambda: packer.try_pack(order), 1, indexName
+
+    # 先装入前一半物品，之后只查询不装入，状态在所有采样中保持不变；scan只影响被测的调用
+    half = len(order) // 2
+    packer.try_pack(order[:half])
+    index = None if path == 'scan' else packer.index
+    items, RPNXY = packer.items, packer.RPNXY
+    Bin = [WIDTH, packer.LENGTH]
+    queries = [int(i) for i in order[half:half + QUERIES]]
+    if kernel == 'finalPos':
+        def run():
+            for i in queries:
+                finalPos(items[i], AllItem, Bin, RPNXY, index)
+        return run, len(queries), indexName
+    if kernel == 'overlap':
+        positions = [finalPos(items[i], AllItem, Bin, RPNXY, index) for i in queries]
+
+        def run():
+            for i, itemRP in zip(queries, positions):
+                overlap(items[i], AllItem, itemRP, RPNXY, index)
+        return run, len(queries), indexName
+    raise ValueError(f"unknown kernel: {kernel}")
+
+
+# 对一个函数计时：预热warmup次后采样repeats次，返回每次调用的时间（秒）列表
+def sample(run, calls, warmup, repeats):
+    for _ in range(warmup):
+        run()
+    times = []
+    for _ in range(repeats):
+        start_time = time.perf_counter()
+        run()
+        times.append((time.perf_counter() - start_time) / calls)
+    return times
+
+
+# 单独运行一次并记录Python分配内存的峰值（字节）
+def peak_memory(run):
+    tracemalloc.start()
+    try:
+        run()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+# 开启统计后单独运行一次，返回finalPos等函数的计数和耗时分布
+def instrumented_stats(run):
+    instrument.reset()
+    with instrument.instrumented():
+        run()
+    return instrument.stats()
+
+
+# 启动时间：repeats次在新进程中导入装箱引擎并装入10个物品，返回总时间（含解释器启动）的中位数、
+# 进程内导入加装箱时间的中位数，以及导入过的重量级模块
+def startup_time(repeats):
+    script = STARTUP_SCRIPT.format(path=os.path.dirname(os.path.abspath(tools.__file__)), heavy=HEAVY_MODULES)
+    total, in_process, heavy = [], [], set()
+    for _ in range(repeats):
+        start_time = time.perf_counter()
+        output = subprocess.run([sys.executable, '-c', script], capture_output=True, text=True, check=True).stdout
+        total.append(time.perf_counter() - start_time)
+        child = json.loads(output)
+        in_process.append(child['in_process'])
+        heavy.update(child['heavy'])
+    return {'total': summarize(total)[0], 'in_process': summarize(in_process)[0], 'heavy_modules': sorted(heavy)}
+
+
+# 中位数和四分位距
+def summarize(times):
+    q1, median, q3 = np.percentile(times, [25, 50, 75])
+    return float(median), float(q3 - q1)
+
+
+# 对数坐标下中位时间与输入尺寸的线性拟合斜率，即经验复杂度指数（时间约为尺寸的k次方）
+# 输出：  {测试项: {分布: 指数}}，尺寸少于两个时没有结果
+def scaling_exponents(results):
+    points = {}
+    for r in results:
+        points.setdefault((r['kernel'], r['dist']), {})[r['size']] = r['median']
+    exponents = {}
+    for (kernel, dist), by_size in sorted(points.items()):
+        sizes = sorted(size for size in by_size if by_size[size] > 0)
+        if len(sizes) < 2:
+            continue
+        slope = np.polyfit(np.log(sizes), np.log([by_size[size] for size in sizes]), 1)[0]
+        exponents.setdefault(kernel, {})[str(dist)] = round(float(slope), 3)
+    return exponents
+
+
+# 与保存的基准结果比较，中位时间变慢超过threshold（比例）且超过两者四分位距之和的记为回退
+# 输出：  回退列表，每项为(文件，测试项，基准中位时间，当前中位时间)
+def compare(report, baseline, threshold):
+    old = {(r['file'], r['kernel'], r['path'], r.get('scale', 1)): r for r in baseline['results']}
+    regressions = []
+    for r in report['results']:
+        b = old.get((r['file'], r['kernel'], r['path'], r['scale']))
+        if b is None:
+            continue
+        ratio = r['median'] / b['median'] if b['median'] > 0 else float('inf')
+        flag = ratio > 1 + threshold and r['median'] - b['median'] > r['iqr'] + b['iqr']
+        print(f"{r['file']}\t {r['kernel']}\t 基准: {b['median']:.6g} 秒\t 当前: {r['median']:.6g} 秒\t 比值: {ratio:.3f}"
+              + ("\t 回退" if flag else ""))
+        if flag:
+            regressions.append((r['file'], r['kernel'], b['median'], r['median']))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='装箱引擎基准测试：try_pack、finalPos和overlap分别计时，输出JSON并可与基准结果比较')
+    parser.add_argument('--cases-dir', default='Test_cases', help='测试文件所在目录')
+    parser.add_argument('--kernels', nargs='+', default=list(KERNELS), choices=KERNELS, help='测试项')
+    parser.add_argument('--path', default='index', choices=['index', 'contour', 'placed', 'scan'],
+                        help='使用的索引：引擎选择的索引、Contour、PlacedIndex，或不使用索引（scan，只用于finalPos和overlap）')
+    parser.add_argument('--scale', type=int, default=1, help='箱子宽度和物品尺寸放大的倍数')
+    parser.add_argument('--max-size', type=int, default=None, help='只测试输入尺寸不超过该值的文件')
+    parser.add_argument('--dists', type=int, nargs='+', default=None, help='只测试这些分布')
+    parser.add_argument('--seed', type=int, default=0, help='装箱顺序的随机种子')
+    parser.add_argument('--warmup', type=int, default=1, help='预热次数')
+    parser.add_argument('--repeats', type=int, default=5, help='采样次数')
+    parser.add_argument('--no-memory', action='store_true', help='不记录内存峰值')
+    parser.add_argument('--instrument', action='store_true', help='额外运行一次并记录finalPos等函数的计数和耗时分布')
+    parser.add_argument('--out', default='bench_results.json', help='JSON输出文件')
+    parser.add_argument('--baseline', default=None, help='用于比较的基准JSON文件')
+    parser.add_argument('--threshold', type=float, default=0.1, help='判定回退的变慢比例')
+    parser.add_argument('--startup-budget', type=float, default=None,
+                        help='测量导入装箱引擎并装入10个物品的启动时间（秒），超过该值或导入了pandas/matplotlib时判定失败')
+    args = parser.parse_args()
+
+    cases = []
+    for filename in os.listdir(args.cases_dir):
+        if filename.endswith('.txt'):
+            size, dist = parse_case_name(filename)
+            if (args.max_size is None or size <= args.max_size) and (args.dists is None or dist in args.dists):
+                cases.append((size, dist, filename))
+    cases.sort()
+
+    results = []
+    for size, dist, filename in cases:
+        WIDTH, itemNum, AllItem = read_input_from_file(os.path.join(args.cases_dir, filename))
+        if args.scale != 1:
+            WIDTH, AllItem = WIDTH * args.scale, np.asarray(AllItem, dtype=np.int64) * args.scale
+        order = seeded_order(args.seed, itemNum)
+        for kernel in args.kernels:
+            path = 'index' if kernel == 'try_pack' and args.path == 'scan' else args.path
+            run, calls, indexName = make_kernel(kernel, WIDTH, AllItem, order, path)
+            times = sample(run, calls, args.warmup, args.repeats)
+            median, iqr = summarize(times)
+            result = {'file': filename, 'size': size, 'dist': dist, 'kernel': kernel, 'path': path,
+                      'index': indexName, 'scale': args.scale,
+                      'calls': calls, 'median': median, 'iqr': iqr, 'samples': times}
+            if not args.no_memory:
+                result['peak_bytes'] = peak_memory(run)
+            if args.instrument:
+                result['instrumentation'] = instrumented_stats(run)
+            results.append(result)
+            print(f"{filename}\t {kernel}\t {indexName or 'scan'}\t 中位数: {median:.6g} 秒\t 四分位距: {iqr:.3g} 秒"
+                  + (f"\t 内存峰值: {result['peak_bytes'] / 1024:.1f} KiB" if 'peak_bytes' in result else ""))
+
+    report = {
+        'meta': {'python': sys.version.split()[0], 'numpy': np.__version__, 'platform': platform.platform(),
+                 'seed': args.seed, 'scale': args.scale, 'warmup': args.warmup, 'repeats': args.repeats, 'queries': QUERIES},
+        'results': results,
+        'scaling': scaling_exponents(results),
+    }
+    failed = False
+    if args.startup_budget is not None:
+        startup = startup_time(args.repeats)
+        startup['budget'] = args.startup_budget
+        report['startup'] = startup
+        print(f"启动时间: {startup['total']:.4f} 秒（导入加装箱 {startup['in_process']:.4f} 秒）\t 预算: {args.startup_budget} 秒"
+              + (f"\t 导入了: {', '.join(startup['heavy_modules'])}" if startup['heavy_modules'] else ""))
+        failed = startup['total'] > args.startup_budget or bool(startup['heavy_modules'])
+    for kernel, by_dist in report['scaling'].items():
+        print(f"{kernel} 经验复杂度指数: " + ', '.join(f"dist_{dist}: {k}" for dist, k in by_dist.items()))
+    with open(args.out, 'w') as file:
+        json.dump(report, file, indent=1)
+    print(f"结果已保存至 {args.out}")
+
+    if args.baseline:
+        with open(args.baseline, 'r') as file:
+            baseline = json.load(file)
+        regressions = compare(report, baseline, args.threshold)
+        print(f"回退: {len(regressions)}")
+        failed = failed or bool(regressions)
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
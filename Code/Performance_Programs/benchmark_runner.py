@@ -0,0 +1,173 @@
+import argparse
+import csv
+import json
+import os
+import signal
+import time
+from multiprocessing import Pool
+import numpy as np
+from bl_packer import BottomLeftPacker
+from instance_io import read_input_from_file
+from result_cache import ResultCache, cached_try_pack
+
+
+# 从文件名中提取输入尺寸和分布，例如test_size_100_dist_2.txt -> (100, 2)
+def parse_case_name(filename):
+    size = int(filename.split('size_')[1].split('_')[0])
+    dist = int(filename.split('dist_')[1].split('.txt')[0])
+    return size, dist
+
+
+class JobTimeout(Exception):
+    pass
+
+
+def _on_alarm(signum, frame):
+    raise JobTimeout()
+
+
+# 每个子进程打开一次结果缓存，cache_dir为None时不使用缓存
+_caches = {}
+
+
+def worker_cache(cache_dir, max_bytes):
+    if cache_dir is None:
+        return None
+    if cache_dir not in _caches:
+        _caches[cache_dir] = ResultCache(cache_dir, max_bytes)
+    return _caches[cache_dir]
+
+
+# 单个任务：对一个测试文件做第rep次装箱，第0次使用文件中的顺序，其余使用以rep为种子的随机顺序
+# 使用结果缓存时先查缓存，命中的结果标记cached，其时间不计入平均运行时间
+# 输出：  结果字典，超时时status为timeout
+def run_job(job):
+    path, rep, timeout, cache_dir, cache_bytes = job
+    size, dist = parse_case_name(os.path.basename(path))
+    result = {'file': os.path.basename(path), 'size': size, 'dist': dist, 'rep': rep}
+    use_alarm = timeout and hasattr(signal, 'SIGALRM')
+    if use_alarm:
+        signal.signal(signal.SIGALRM, _on_alarm)
+        signal.alarm(timeout)
+    try:
+        WIDTH, itemNum, AllItem = read_input_from_file(path)
+        order = None if rep == 0 else np.random.default_rng(rep).permutation(itemNum)
+        start_time = time.perf_counter()
+        packer = BottomLeftPacker(WIDTH, AllItem)
+        cache = worker_cache(cache_dir, cache_bytes)
+        hits = cache.hits if cache else 0
+        packed, height, coverage, _ = cached_try_pack(cache, packer, order)
+        execution_time = time.perf_counter() - start_time
+        result.update(status='ok' if packed else 'unpacked', time=execution_time,
+                      height=int(height), coverage=float(coverage))
+        if cache:
+            result['cached'] = cache.hits > hits
+    except JobTimeout:
+        result.update(status='timeout', time=timeout)
+    finally:
+        if use_alarm:
+            signal.alarm(0)
+    return result
+
+
+# 读取已有的结果文件，中断后重新运行时跳过已经完成的任务
+# 中断时最后一行可能只写了一半，截掉这部分，之后追加的记录从新的一行开始
+def load_results(results_path):
+    results = []
+    if os.path.exists(results_path):
+        with open(results_path, 'rb+') as file:
+            data = file.read()
+            if data and not data.endswith(b'\n'):
+                file.truncate(data.rfind(b'\n') + 1)
+        with open(results_path, 'r') as file:
+            for line in file:
+                line = line.strip()
+                if line:
+                    try:
+                        results.append(json.loads(line))
+                    except json.JSONDecodeError:
+                        pass  # 跳过损坏的行，重新运行该任务
+    return results
+
+
+# 根据所有结果写出与原来相同格式的CSV：
+# bl_coverage_data.csv —— 每个输入尺寸和分布的最大覆盖率（与results/csv/bl_coverage_data.csv相同）
+# dist_X_running_times.csv —— 每个分布下各输入尺寸的平均运行时间（与TimePlot_for_bl.py相同）
+def write_csvs(results, out_dir):
+    coverage = {}
+    times = {}
+    for r in results:
+        if r['status'] != 'ok':
+            continue
+        key = (r['size'], r['dist'])
+        coverage[key] = max(coverage.get(key, 0), r['coverage'])
+        if not r.get('cached'):  # 缓存命中的时间不是装箱时间
+            times.setdefault(key, []).append(r['time'])
+    sizes = sorted({size for size, _ in coverage})
+    dists = sorted({dist for _, dist in coverage})
+
+    with open(os.path.join(out_dir, 'bl_coverage_data.csv'), 'w', newline='') as file:
+        writer = csv.writer(file)
+        writer.writerow(['Input Size'] + [f'Dist_{dist}' for dist in dists])
+        for size in sizes:
+            writer.writerow([size] + [coverage.get((size, dist), 0) for dist in dists])
+
+    for dist in dists:
+        with open(os.path.join(out_dir, f'dist_{dist}_running_times.csv'), 'w', newline='') as file:
+            writer = csv.writer(file)
+            writer.writerow(['输入尺寸', '平均运行时间（秒）'])
+            for size in sizes:
+                if (size, dist) in times:
+                    writer.writerow([size, np.mean(times[(size, dist)])])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='并行运行Test_cases目录下所有测试文件的装箱基准测试，可中断后继续')
+    parser.add_argument('--cases-dir', default='Test_cases', help='测试文件所在目录')
+    parser.add_argument('--reps', type=int, default=3, help='每个测试文件的重复次数')
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help='进程数')
+    parser.add_argument('--timeout', type=int, default=600, help='单个任务的超时时间（秒），0表示不限制')
+    parser.add_argument('--results', default='benchmark_results.jsonl', help='逐条追加的结果文件')
+    parser.add_argument('--out-dir', default='.', help='CSV输出目录')
+    parser.add_argument('--retry-timeouts', action='store_true', help='重新运行之前超时的任务')
+    parser.add_argument('--cache-dir', default=None, help='装箱结果缓存目录，默认不使用缓存')
+    parser.add_argument('--cache-max-mb', type=float, default=256, help='结果缓存大小上限（MB）')
+    args = parser.parse_args()
+
+    results = load_results(args.results)
+    done = {(r['file'], r['rep']) for r in results if not args.retry_timeouts or r['status'] != 'timeout'}
+    results = [r for r in results if (r['file'], r['rep']) in done]
+
+    # 所有(文件，重复次数)任务，输入尺寸大的先运行，避免最大的文件最后才开始
+    jobs = []
+    for filename in os.listdir(args.cases_dir):
+        if filename.endswith('.txt'):
+            for rep in range(args.reps):
+                if (filename, rep) not in done:
+                    jobs.append((os.path.join(args.cases_dir, filename), rep, args.timeout, args.cache_dir,
+                                 int(args.cache_max_mb * (1 << 20))))
+    jobs.sort(key=lambda job: (-parse_case_name(os.path.basename(job[0]))[0], job[0], job[1]))
+    print(f"已完成任务: {len(done)}\t 待运行任务: {len(jobs)}")
+
+    # 每完成一个任务立即追加写入结果文件
+    hits = misses = 0
+    with open(args.results, 'a') as out, Pool(args.workers) as pool:
+        for result in pool.imap_unordered(run_job, jobs):
+            out.write(json.dumps(result) + '\n')
+            out.flush()
+            results.append(result)
+            if 'cached' in result:
+                hits += result['cached']
+                misses += not result['cached']
+            print(f"{result['file']}\t rep {result['rep']}\t {result['status']}\t 执行时间: {result['time']:.4f} 秒"
+                  + ("\t (cached)" if result.get('cached') else ""))
+    if args.cache_dir:
+        print(f"Cache hits: {hits}\t misses: {misses}")
+
+    os.makedirs(args.out_dir, exist_ok=True)
+    write_csvs(results, args.out_dir)
+    print(f"处理完成！结果已保存至 {args.out_dir}")
+
+
+if __name__ == '__main__':
+    main()